@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,7 +47,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # اول لیست تا زمان و کوئری‌های بقیه middlewareها هم شمرده شود؛ با PROFILING خاموش حذف می‌شود
+    "home.middleware.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # static قبل از session و auth؛ با DEBUG حذف می‌شود (home.staticfiles)
+    "home.staticfiles.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -78,11 +83,111 @@ WSGI_APPLICATION = "Accounting.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite برای production:
+# - WAL: خواننده‌ها و یک نویسنده همزمان بدون قفل کردن هم کار می‌کنند
+# - synchronous=NORMAL: در WAL امن است و fsync هر commit را حذف می‌کند
+# - mmap_size / cache_size: خواندن از حافظه به جای syscall (۲۵۶ و ۶۴ مگابایت)
+# - transaction_mode=IMMEDIATE: قفل نوشتن از ابتدای atomic گرفته می‌شود و به جای
+#   خطای فوری "database is locked" تا timeout ثانیه صبر می‌کند (home.db.retry_on_busy برای بعد از آن)
+# - CONN_MAX_AGE: اتصال و pragmaها بین درخواست‌ها باز می‌مانند
+SQLITE_INIT_COMMAND = ";".join(
+    [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA cache_size=-65536",
+        "PRAGMA temp_store=MEMORY",
+    ]
+)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "init_command": SQLITE_INIT_COMMAND,
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        },
+        # دیتابیس تست روی فایل (نه حافظه) تا تست‌های همزمانی چند اتصال داشته باشند
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# locmem برای هر پروسه جداست؛ با چند worker از FileBasedCache یا Redis استفاده شود
+
+# cache مشترک session و کاربر بین workerها: مسیر پوشه (FileBasedCache روی همان
+# سرور) یا redis://... ؛ بدون آن session و کاربر هر درخواست از دیتابیس خوانده می‌شوند
+SESSION_CACHE = os.environ.get("ACCOUNTING_SESSION_CACHE")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "accounting",
+    },
+    # session و کاربر هر درخواست؛ جدا تا cache صفحات آن‌ها را بیرون نیندازد
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "accounting-sessions",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+if SESSION_CACHE:
+    CACHES["sessions"] = {
+        "BACKEND": (
+            "django.core.cache.backends.redis.RedisCache"
+            if SESSION_CACHE.startswith(("redis://", "rediss://"))
+            else "django.core.cache.backends.filebased.FileBasedCache"
+        ),
+        "LOCATION": SESSION_CACHE,
+        "OPTIONS": {"MAX_ENTRIES": 10000} if "://" not in SESSION_CACHE else {},
     }
+
+
+# Sessions and authentication
+# cached_db: خواندن session از cache و در صورت نبودن از دیتابیس؛ نوشتن در هر دو.
+# home.auth.CachedModelBackend کاربر را هم از همین cache می‌خواند، پس درخواست
+# کاربر واردشده با cache گرم کوئری session/auth_user ندارد (manage.py bench_auth).
+# خروج و تغییر رمز فقط cache همان پروسه را پاک می‌کنند، پس این حالت فقط با
+# ACCOUNTING_SESSION_CACHE (cache مشترک) روشن می‌شود؛ check home.W001 ترکیب
+# cached_db با locmem را گزارش می‌کند.
+
+SESSION_CACHE_ALIAS = "sessions"
+if SESSION_CACHE:
+    SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+    AUTHENTICATION_BACKENDS = ["home.auth.CachedModelBackend"]
+else:
+    SESSION_ENGINE = "django.contrib.sessions.backends.db"
+    AUTHENTICATION_BACKENDS = ["django.contrib.auth.backends.ModelBackend"]
+
+
+# Profiling (home.middleware.ProfilingMiddleware)
+# زمان هر درخواست، تعداد/زمان کوئری‌ها و کوئری‌های تکراری در لاگ home.profiling و هدر Server-Timing.
+# PROFILER: None یا "cprofile" (.prof) یا "sample" (.folded برای flamegraph)؛ فقط درخواست‌های کندتر از SLOW_MS ذخیره می‌شوند.
+
+PROFILING = {
+    "ENABLED": False,
+    "SLOW_MS": 500,
+    "PROFILER": None,
+    "PROFILE_DIR": BASE_DIR / "profiles",
+    "SAMPLE_INTERVAL_MS": 5,
+    "DUPLICATE_THRESHOLD": 3,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "home.profiling": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
 }
 
 
@@ -133,6 +238,20 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# production: نام‌های hash‌دار و نسخه‌های .gz/.br در collectstatic، سرو با
+# home.staticfiles.StaticFilesMiddleware و Cache-Control immutable.
+# نسخه WOFF2 فونت‌ها با manage.py subset_fonts ساخته می‌شود.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "home.staticfiles.CompressedManifestStaticFilesStorage"
+        ),
+    },
+}
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
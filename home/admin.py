@@ -1,5 +1,30 @@
 from django.contrib import admin
-from .models import Account, Transaction
+from django.db.transaction import atomic
+from .models import Account, Category, Transaction
+from . import balances
+
+
+class TransactionAdmin(admin.ModelAdmin):
+    # تغییرات از پنل ادمین هم باید جمع‌های ذخیره‌شده حساب را به‌روز نگه دارند
+    def save_model(self, request, obj, form, change):
+        with atomic():
+            if change:
+                previous = Transaction.objects.get(pk=obj.pk)
+                balances.unrecord(previous)
+            super().save_model(request, obj, form, change)
+            balances.record(obj)
+
+    def delete_model(self, request, obj):
+        with atomic():
+            balances.unrecord(obj)
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with atomic():
+            balances.post_entries(map(balances.entry, queryset), sign=-1)
+            super().delete_queryset(request, queryset)
+
 
 admin.site.register(Account)
-admin.site.register(Transaction)
+admin.site.register(Category)
+admin.site.register(Transaction, TransactionAdmin)
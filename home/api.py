@@ -0,0 +1,278 @@
+"""
+API JSON برای حساب‌ها و تراکنش‌ها (لیست، جزئیات، ثبت تکی و گروهی).
+
+ردیف‌ها با values() خوانده و مستقیم به JSON تبدیل می‌شوند (بدون ساخت شیء مدل).
+لیست‌ها با cursor و به ترتیب id صفحه‌بندی می‌شوند. id فقط زیاد می‌شود (SQLite
+با AUTOINCREMENT و نوشتن‌های پشت سر هم)، پس کلاینت همگام‌سازی که از cursor
+آخرین پاسخ (حتی صفحه آخر) ادامه می‌دهد هر ردیف تازه را دقیقا یک بار می‌بیند،
+حتی تراکنشی که با تاریخ گذشته ثبت شده باشد؛ ترتیب (date, id) دفتر حساب این را
+تضمین نمی‌کند. ویرایش و حذف ردیف‌های قبلی از این راه دیده نمی‌شوند. با
+?fields=id,amount فقط همان ستون‌ها خوانده و فرستاده می‌شوند.
+
+ثبت تراکنش‌ها از همان TransactionImporter صفحه ورود گروهی می‌گذرد (تاریخ شمسی
+با validate_jalali_dates مثل فرم‌ها، یا تاریخ میلادی ISO). احراز هویت با session
+است و POST مثل بقیه فرم‌ها توکن CSRF می‌خواهد.
+"""
+
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.db.transaction import atomic
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.views import View
+
+from .db import retry_on_busy
+from .forms import AccountForm
+from .importer import TransactionImporter
+from .models import Account, Transaction
+from . import balances, dashboard, search
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BULK = 5000
+
+ACCOUNT_FIELDS = ("id", "full_name", "email", "phone_number", "address")
+TRANSACTION_FIELDS = (
+    "id",
+    "account_id",
+    "type",
+    "amount",
+    "date",
+    "category_id",
+    "category_name",
+    "description",
+    "created_at",
+)
+# ستون‌هایی که از جدول دیگری خوانده می‌شوند
+TRANSACTION_EXPRESSIONS = {"category_name": F("category__name")}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def error_response(message, status=400, **extra):
+    return JsonResponse({"error": message, **extra}, status=status)
+
+
+def read_json(request):
+    try:
+        return json.loads(request.body)
+    except (UnicodeDecodeError, ValueError):
+        raise ApiError("بدنه درخواست JSON معتبر نیست.")
+
+
+def sparse_fields(request, allowed):
+    value = request.GET.get("fields")
+    if not value:
+        return list(allowed)
+    fields = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = sorted(set(fields) - set(allowed))
+    if unknown:
+        raise ApiError(f"فیلد نامعتبر: {', '.join(unknown)}")
+    return fields
+
+
+def page_size(request):
+    try:
+        size = int(request.GET.get("limit", PAGE_SIZE))
+    except ValueError:
+        raise ApiError("limit باید عدد باشد.")
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def cursor_page(rows, size, keys, fields, encode, current=None):
+    """
+    rows: size + 1 ردیف از values(); ستون‌های keys برای ساخت cursor خوانده
+    شده‌اند و اگر در fields نباشند از خروجی حذف می‌شوند. next فقط وقتی صفحه
+    بعدی هست؛ cursor همیشه بعد از آخرین ردیف دیده‌شده است (current اگر صفحه
+    خالی باشد) تا همگام‌سازی بعدی از صفحه آخر ادامه دهد.
+    """
+    rows = list(rows)
+    has_next = len(rows) > size
+    rows = rows[:size]
+    last_cursor = encode(*(rows[-1][key] for key in keys)) if rows else current
+    next_cursor = last_cursor if has_next else None
+    extra = [key for key in keys if key not in fields]
+    if extra:
+        for row in rows:
+            for key in extra:
+                del row[key]
+    return {"results": rows, "next": next_cursor, "cursor": last_cursor}
+
+
+def transaction_values(transactions, fields):
+    columns = [name for name in fields if name not in TRANSACTION_EXPRESSIONS]
+    expressions = {
+        name: TRANSACTION_EXPRESSIONS[name] for name in fields if name in TRANSACTION_EXPRESSIONS
+    }
+    return transactions.values(*columns, **expressions)
+
+
+def encode_id(pk):
+    return urlsafe_base64_encode(str(pk).encode())
+
+
+def decode_id(cursor):
+    try:
+        return int(urlsafe_base64_decode(cursor).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ApiError("cursor نامعتبر است.")
+
+
+class ApiView(View):
+    """پاسخ JSON برای خطاها و کاربر واردنشده (به جای redirect صفحه ورود)."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return error_response("ابتدا وارد شوید.", status=401)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as e:
+            return error_response(e.message, status=e.status)
+
+    def http_method_not_allowed(self, request, *args, **kwargs):
+        allowed = super().http_method_not_allowed(request, *args, **kwargs)["Allow"]
+        response = error_response("متد مجاز نیست.", status=405)
+        response["Allow"] = allowed
+        return response
+
+
+class AccountsApiView(ApiView):
+    def get(self, request):
+        fields = sparse_fields(request, ACCOUNT_FIELDS)
+        size = page_size(request)
+        accounts = Account.objects.filter(user=request.user).order_by("id")
+        cursor = request.GET.get("cursor")
+        if cursor:
+            accounts = accounts.filter(id__gt=decode_id(cursor))
+        rows = accounts.values(*fields, *(["id"] if "id" not in fields else []))
+        return JsonResponse(
+            cursor_page(rows[: size + 1], size, ["id"], fields, encode_id, cursor)
+        )
+
+    @method_decorator(retry_on_busy)
+    def post(self, request):
+        """یک شیء یا لیستی از شیءها؛ اگر یکی نامعتبر باشد هیچ حسابی ساخته نمی‌شود."""
+        data = read_json(request)
+        many = isinstance(data, list)
+        items = data if many else [data]
+        if not items or len(items) > MAX_BULK:
+            raise ApiError(f"تعداد ردیف‌ها باید بین ۱ و {MAX_BULK} باشد.")
+
+        accounts, errors = [], []
+        for index, item in enumerate(items):
+            form = AccountForm(item if isinstance(item, dict) else {})
+            if form.is_valid():
+                account = form.save(commit=False)
+                account.user = request.user
+                accounts.append(account)
+            else:
+                errors.append({"index": index, "errors": form.errors.get_json_data()})
+        if errors:
+            return error_response("ردیف‌های نامعتبر", errors=errors)
+
+        with atomic():
+            # bulk_create سیگنال post_save ندارد
+            Account.objects.bulk_create(accounts)
+            search.index_accounts(accounts)
+            balances.bump_versions([account.pk for account in accounts])
+        dashboard.invalidate(request.user.pk)
+        rows = list(
+            Account.objects.filter(pk__in=[account.pk for account in accounts])
+            .order_by("id")
+            .values(*ACCOUNT_FIELDS)
+        )
+        return JsonResponse({"results": rows} if many else rows[0], status=201)
+
+
+class AccountApiView(ApiView):
+    def get(self, request, pk):
+        fields = sparse_fields(request, ACCOUNT_FIELDS)
+        row = Account.objects.filter(user=request.user, pk=pk).values(*fields).first()
+        if row is None:
+            raise ApiError("حساب پیدا نشد.", status=404)
+        return JsonResponse(row)
+
+
+class ApiImporter(TransactionImporter):
+    """TransactionImporter که شناسه تراکنش‌های ساخته‌شده را هم نگه می‌دارد."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_ids = []
+
+    def write(self, transactions, names):
+        super().write(transactions, names)
+        self.created_ids.extend(transaction.pk for transaction in transactions)
+
+
+class TransactionsApiView(ApiView):
+    def get(self, request):
+        fields = sparse_fields(request, TRANSACTION_FIELDS)
+        size = page_size(request)
+        transactions = Transaction.objects.filter(account__user=request.user).order_by("id")
+        account = request.GET.get("account")
+        if account:
+            if not account.isdigit():
+                raise ApiError("account باید شماره حساب باشد.")
+            transactions = transactions.filter(account_id=account)
+        cursor = request.GET.get("cursor")
+        if cursor:
+            transactions = transactions.filter(id__gt=decode_id(cursor))
+        rows = transaction_values(
+            transactions, [*fields, *(["id"] if "id" not in fields else [])]
+        )
+        return JsonResponse(
+            cursor_page(rows[: size + 1], size, ["id"], fields, encode_id, cursor)
+        )
+
+    def post(self, request):
+        """
+        یک شیء یا لیستی از شیءها با account (شماره حساب)، type (RE/EX)، amount،
+        date (شمسی YYYY/MM/DD یا میلادی ISO)، category (نام دسته) و description. ردیف‌های
+        معتبر ثبت و خطای بقیه با شماره ردیف (از صفر) برگردانده می‌شود.
+        """
+        data = read_json(request)
+        many = isinstance(data, list)
+        items = data if many else [data]
+        if not items or len(items) > MAX_BULK:
+            raise ApiError(f"تعداد ردیف‌ها باید بین ۱ و {MAX_BULK} باشد.")
+        for item in items:
+            if isinstance(item, dict) and "model" in item:
+                # قالب dumpdata فقط از صفحه ورود گروهی پذیرفته می‌شود
+                raise ApiError("قالب dumpdata پشتیبانی نمی‌شود.")
+
+        importer = ApiImporter(request.user)
+        try:
+            result = importer.run(enumerate(items))
+        except ValidationError as e:
+            raise ApiError("؛ ".join(e.messages))
+        errors = [{"index": line, "error": message} for line, message in result.errors]
+        if not importer.created_ids:
+            return error_response("ردیف‌های نامعتبر", errors=errors)
+
+        created = Transaction.objects.filter(pk__in=importer.created_ids).order_by("id")
+        rows = list(transaction_values(created, TRANSACTION_FIELDS))
+        if not many:
+            return JsonResponse(rows[0], status=201)
+        return JsonResponse(
+            {"results": rows, "created": result.created, "errors": errors}, status=201
+        )
+
+
+class TransactionApiView(ApiView):
+    def get(self, request, pk):
+        fields = sparse_fields(request, TRANSACTION_FIELDS)
+        row = transaction_values(
+            Transaction.objects.filter(account__user=request.user, pk=pk), fields
+        ).first()
+        if row is None:
+            raise ApiError("تراکنش پیدا نشد.", status=404)
+        return JsonResponse(row)
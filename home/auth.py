@@ -0,0 +1,66 @@
+"""
+بارگذاری کاربر هر درخواست از cache به جای جدول auth_user.
+
+همراه با SESSION_ENGINE=cached_db (settings) یک درخواست کاربر واردشده با
+cache گرم هیچ کوئری برای session و کاربر نمی‌زند. کاربر cacheشده با هر ذخیره
+User (تغییر رمز در ResetPassword، last_login هنگام ورود) و هنگام خروج از
+cache حذف می‌شود (home.signals)؛ تایید session با هش رمز همچنان روی همین
+شیء انجام می‌شود.
+
+حذف از cache فقط وقتی به همه workerها می‌رسد که cache مشترک باشد (فایل یا
+Redis، ACCOUNTING_SESSION_CACHE)؛ check_shared_cache ترکیب این backend یا
+session cached_db با locmem را گزارش می‌کند.
+"""
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core import checks
+from django.core.cache import caches
+
+TIMEOUT = 5 * 60
+CACHED_SESSION_ENGINES = (
+    "django.contrib.sessions.backends.cache",
+    "django.contrib.sessions.backends.cached_db",
+)
+
+
+def user_cache():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def cache_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def invalidate(user_id):
+    user_cache().delete(cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = cache_key(user_id)
+        user = user_cache().get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                user_cache().set(key, user, TIMEOUT)
+        return user
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    cached = (
+        settings.SESSION_ENGINE in CACHED_SESSION_ENGINES
+        or "home.auth.CachedModelBackend" in settings.AUTHENTICATION_BACKENDS
+    )
+    backend = settings.CACHES.get(settings.SESSION_CACHE_ALIAS, {}).get("BACKEND", "")
+    if settings.DEBUG or not cached or not backend.endswith("LocMemCache"):
+        return []
+    return [
+        checks.Warning(
+            "session یا کاربر از cache محلی هر پروسه خوانده می‌شود؛ خروج و تغییر رمز "
+            "به workerهای دیگر نمی‌رسد.",
+            hint="ACCOUNTING_SESSION_CACHE را روی یک پوشه مشترک یا redis://... بگذارید.",
+            id="home.W001",
+        )
+    ]
@@ -0,0 +1,272 @@
+from collections import defaultdict, namedtuple
+from datetime import datetime, time
+
+from django.db import connection
+from django.db.models import Count, F, Q, Subquery, Sum
+from django.db.models.functions import TruncDate
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from .models import (
+    Account,
+    AccountBalance,
+    AccountDailyBalance,
+    CategoryDailyBalance,
+    Transaction,
+)
+
+
+# اثر یک تراکنش روی جمع‌ها؛ برای ویرایش، مقدار قبلی را قبل از bind فرم نگه می‌داریم
+Entry = namedtuple("Entry", "account_id day type amount category")
+
+
+def to_day(value):
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    return value
+
+
+def day_start(day):
+    start = datetime.combine(day, time.min)
+    if timezone.is_naive(start):
+        start = timezone.make_aware(start)
+    return start
+
+
+def entry(txn):
+    return Entry(
+        txn.account_id, to_day(txn.date), txn.type, txn.amount, txn.category_id or 0
+    )
+
+
+def _upsert(model, key, rows):
+    """
+    افزودن مقادیر به ردیف‌های موجود (یا ساخت ردیف) با یک دستور UPSERT، تا
+    به‌روزرسانی هم اتمی باشد و هم برای چند ردیف یکجا اجرا شود.
+    """
+    if not rows:
+        return
+    table = model._meta.db_table
+    columns = [*key, "total_income", "total_expense", "transaction_count"]
+    updates = ", ".join(
+        f"{column} = {table}.{column} + excluded.{column}" for column in columns[len(key):]
+    )
+    if model is AccountBalance:
+        columns += ["version", "updated_at"]
+        updates += f", version = {table}.version + 1, updated_at = excluded.updated_at"
+        now = timezone.now()
+        rows = [(*row, 1, now) for row in rows]
+    placeholders = ", ".join(["%s"] * len(columns))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({', '.join(key)}) DO UPDATE SET {updates}",
+            rows,
+        )
+
+
+def post_entries(entries, sign=1):
+    """اعمال (sign=1) یا برگرداندن (sign=-1) اثر چند تراکنش روی جمع‌ها."""
+    totals = defaultdict(lambda: [0, 0, 0])
+    daily = defaultdict(lambda: [0, 0, 0])
+    categories = defaultdict(lambda: [0, 0, 0])
+    for e in entries:
+        for bucket in (
+            totals[e.account_id],
+            daily[e.account_id, e.day],
+            categories[e.account_id, e.day, e.category],
+        ):
+            bucket[0 if e.type == "RE" else 1] += sign * e.amount
+            bucket[2] += sign
+
+    with atomic():
+        _upsert(
+            AccountBalance,
+            ["account_id"],
+            [(account_id, *values) for account_id, values in totals.items()],
+        )
+        _upsert(
+            AccountDailyBalance,
+            ["account_id", "day"],
+            [(account_id, day, *values) for (account_id, day), values in daily.items()],
+        )
+        _upsert(
+            CategoryDailyBalance,
+            ["account_id", "day", "category"],
+            [(*key, *values) for key, values in categories.items()],
+        )
+
+
+def record(txn):
+    post_entries([entry(txn)])
+
+
+def unrecord(txn):
+    post_entries([entry(txn)], sign=-1)
+
+
+def replace(previous, txn):
+    with atomic():
+        post_entries([previous], sign=-1)
+        record(txn)
+
+
+def account_totals(account):
+    totals = (
+        AccountBalance.objects.filter(account=account)
+        .values("total_income", "total_expense", "transaction_count", "version")
+        .first()
+    )
+    if totals is None:
+        totals = {"total_income": 0, "total_expense": 0, "transaction_count": 0, "version": 0}
+    return totals
+
+
+def bump_versions(account_ids):
+    """
+    برای تغییرهایی که از post_entries نمی‌گذرند (مثل ویرایش نام حساب)؛ ردیف
+    حساب بدون تراکنش هم ساخته می‌شود تا حساب در نسخه‌های کاربر دیده شود.
+    """
+    _upsert(AccountBalance, ["account_id"], [(pk, 0, 0, 0) for pk in account_ids])
+
+
+def user_versions(user):
+    """(account_id, version, transaction_count, updated_at) حساب‌های کاربر."""
+    return list(
+        AccountBalance.objects.filter(account__user=user)
+        .order_by("account_id")
+        .values_list("account_id", "version", "transaction_count", "updated_at")
+    )
+
+
+def net_before_day(account_id, day):
+    """
+    مانده حساب در ابتدای روز day: مانده کل (AccountBalance) منهای جمع‌های روزانه
+    از day به بعد، در یک کوئری. هزینه با تعداد روزهای دارای تراکنش از day تا
+    امروز رشد می‌کند، نه با کل تاریخچه حساب: صفحه پیش‌فرض دفتر (جدیدترین
+    تراکنش‌ها) فقط چند ردیف روزانه می‌خواند و هر صفحه قدیمی‌تر به همان نسبت
+    بیشتر.
+    """
+    later = (
+        AccountDailyBalance.objects.filter(account_id=account_id, day__gte=day)
+        .values("account_id")
+        .annotate(net=Sum(F("total_income") - F("total_expense")))
+        .values("net")
+        .order_by()
+    )
+    row = (
+        AccountBalance.objects.filter(account_id=account_id)
+        .annotate(later=Subquery(later))
+        .values_list("total_income", "total_expense", "later")
+        .first()
+    )
+    if row is None:
+        return 0
+    income, expense, later = row
+    return income - expense - (later or 0)
+
+
+def _expected(accounts=None):
+    transactions = Transaction.objects.all()
+    if accounts is not None:
+        transactions = transactions.filter(account__in=accounts)
+    return (
+        transactions.annotate(day=TruncDate("date"))
+        .values("account_id", "day")
+        .annotate(
+            income=Sum("amount", filter=Q(type="RE")),
+            expense=Sum("amount", filter=Q(type="EX")),
+            count=Count("id"),
+        )
+        .order_by()
+    )
+
+
+def rebuild(accounts=None):
+    """بازسازی کامل جمع‌ها از روی جدول تراکنش‌ها."""
+    account_ids = Account.objects.all()
+    if accounts is not None:
+        account_ids = account_ids.filter(pk__in=accounts)
+    account_ids = list(account_ids.values_list("pk", flat=True))
+
+    totals = {pk: [0, 0, 0] for pk in account_ids}
+    daily = []
+    for row in _expected(account_ids).iterator():
+        income, expense = row["income"] or 0, row["expense"] or 0
+        daily.append(
+            AccountDailyBalance(
+                account_id=row["account_id"],
+                day=row["day"],
+                total_income=income,
+                total_expense=expense,
+                transaction_count=row["count"],
+            )
+        )
+        bucket = totals[row["account_id"]]
+        bucket[0] += income
+        bucket[1] += expense
+        bucket[2] += row["count"]
+
+    with atomic():
+        # نسخه‌ها ادامه پیدا می‌کنند تا cacheهای قبلی دوباره معتبر نشوند
+        versions = dict(
+            AccountBalance.objects.filter(account_id__in=account_ids).values_list(
+                "account_id", "version"
+            )
+        )
+        AccountDailyBalance.objects.filter(account_id__in=account_ids).delete()
+        AccountBalance.objects.filter(account_id__in=account_ids).delete()
+        AccountDailyBalance.objects.bulk_create(daily, batch_size=1000)
+        AccountBalance.objects.bulk_create(
+            [
+                AccountBalance(
+                    account_id=pk,
+                    total_income=income,
+                    total_expense=expense,
+                    transaction_count=count,
+                    version=versions.get(pk, 0) + 1,
+                )
+                for pk, (income, expense, count) in totals.items()
+            ],
+            batch_size=1000,
+        )
+    return len(account_ids), len(daily)
+
+
+def verify(accounts=None):
+    """مقایسه جمع‌های ذخیره‌شده با جدول تراکنش‌ها؛ لیست اختلاف‌ها را برمی‌گرداند."""
+    daily = AccountDailyBalance.objects.exclude(transaction_count=0)
+    balances = AccountBalance.objects.all()
+    if accounts is not None:
+        daily = daily.filter(account__in=accounts)
+        balances = balances.filter(account__in=accounts)
+    stored = {
+        (row.account_id, row.day): (
+            row.total_income,
+            row.total_expense,
+            row.transaction_count,
+        )
+        for row in daily
+    }
+    for row in balances:
+        stored[row.account_id, None] = (
+            row.total_income,
+            row.total_expense,
+            row.transaction_count,
+        )
+
+    expected = defaultdict(lambda: (0, 0, 0))
+    for row in _expected(accounts).iterator():
+        values = row["income"] or 0, row["expense"] or 0, row["count"]
+        expected[row["account_id"], row["day"]] = values
+        total = expected[row["account_id"], None]
+        expected[row["account_id"], None] = tuple(map(sum, zip(total, values)))
+
+    mismatches = []
+    for key in expected.keys() | stored.keys():
+        actual = tuple(stored.get(key, (0, 0, 0)))
+        if actual != expected[key]:
+            mismatches.append((key, expected[key], actual))
+    return mismatches
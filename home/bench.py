@@ -0,0 +1,128 @@
+"""
+ابزارهای مشترک دستورهای bench_* : دیتابیس جداگانه برای بنچمارک، داده نمونه
+و اندازه‌گیری زمان. هیچ‌کدام روی دیتابیس اصلی پروژه نمی‌نویسند.
+"""
+
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.utils import timezone
+
+from .models import Account, Category, Transaction
+from . import balances, reports, search
+
+DESCRIPTIONS = [
+    "خرید مواد غذایی",
+    "قبض برق",
+    "قبض آب",
+    "اجاره خانه",
+    "حقوق ماهانه",
+    "کرایه تاکسی",
+    "خرید لوازم التحریر",
+    "شارژ ساختمان",
+    "قسط وام",
+    "هدیه تولد",
+    "فروش کالا",
+    "پرداخت به تامین‌کننده",
+]
+CATEGORIES = ["خوراک", "قبوض", "مسکن", "حقوق", "حمل و نقل", "فروش", "متفرقه"]
+
+
+@contextmanager
+def bench_database(path, fresh=True):
+    """
+    اتصال default را موقتا به فایل path می‌برد (مثل test runner جنگو) و
+    migrate می‌کند، تا viewها و سرویس‌ها بدون تغییر روی داده بنچمارک اجرا شوند.
+    """
+    path = Path(path)
+    if fresh and path.exists():
+        path.unlink()
+    connection = connections["default"]
+    connection.close()
+    original = connection.settings_dict["NAME"]
+    connection.settings_dict["NAME"] = str(path)
+    try:
+        call_command("migrate", verbosity=0, interactive=False)
+        yield connection
+    finally:
+        connections.close_all()
+        connection.settings_dict["NAME"] = original
+
+
+def seed(users=1, accounts=1, transactions=1000, days=720, batch_size=5000, seed=0):
+    """
+    users × accounts × transactions داده نمونه با توضیحات فارسی و تاریخ‌های
+    پخش‌شده در days روز گذشته. کاربران رمز عبور "bench" دارند.
+    """
+    rnd = random.Random(seed)
+    User = get_user_model()
+    now = timezone.now()
+    created = []
+    for u in range(users):
+        user = User.objects.create_user(f"bench{u}", password="bench")
+        account_objs = Account.objects.bulk_create(
+            [
+                Account(full_name=f"حساب {u}-{a}", user=user)
+                for a in range(accounts)
+            ]
+        )
+        created.append((user, account_objs))
+        category_objs = Category.objects.bulk_create(
+            [Category(user=user, name=name) for name in CATEGORIES]
+        )
+
+        for account in account_objs:
+            remaining = transactions
+            while remaining:
+                size = min(batch_size, remaining)
+                remaining -= size
+                Transaction.objects.bulk_create(
+                    [
+                        Transaction(
+                            account=account,
+                            type=rnd.choice(("RE", "EX")),
+                            amount=rnd.randrange(10_000, 50_000_000, 1000),
+                            category=rnd.choice(category_objs),
+                            description=rnd.choice(DESCRIPTIONS),
+                            date=now - timedelta(days=rnd.randrange(days)),
+                        )
+                        for _ in range(size)
+                    ],
+                    batch_size=batch_size,
+                )
+
+    balances.rebuild()
+    reports.rebuild()
+    search.rebuild()
+    return created
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """صدک‌های samples (میلی‌ثانیه) به روش nearest-rank."""
+    ordered = sorted(samples)
+    result = {}
+    for point in points:
+        index = max(0, -(-point * len(ordered) // 100) - 1)
+        result[f"p{point}_ms"] = round(ordered[index], 3) if ordered else None
+    return result
+
+
+def timed(func, repeat=5):
+    """اجرای func به تعداد repeat و برگرداندن میانه و بیشینه زمان (میلی‌ثانیه)."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
@@ -0,0 +1,107 @@
+"""
+عملیات گروهی روی تراکنش‌ها (حذف، تغییر دسته، تغییر تاریخ، انتقال به حساب
+دیگر) با یک UPDATE/DELETE برای همه ردیف‌ها.
+
+queryset ورودی باید به کاربر محدود شده باشد (account__user). اثر ردیف‌ها روی
+جمع‌ها در همان transaction یکجا برگردانده و دوباره اعمال می‌شود. UPDATE و
+DELETE گروهی سیگنال ندارند، پس ایندکس جستجو و داشبورد همین‌جا به‌روز می‌شوند.
+"""
+
+from django.db import connection
+from django.db.transaction import atomic
+
+from .models import Transaction
+from . import balances, categories, dashboard, search
+
+ACTIONS = ("delete", "category", "date", "move")
+# تعداد شناسه‌ها در هر DELETE؛ زیر سقف پارامترهای SQLite
+DELETE_BATCH = 500
+
+
+def _entries(transactions):
+    rows = transactions.values_list("pk", "account_id", "date", "type", "amount", "category_id")
+    pks, entries = [], []
+    for pk, account_id, date, type, amount, category_id in rows:
+        pks.append(pk)
+        entries.append(
+            balances.Entry(account_id, balances.to_day(date), type, amount, category_id or 0)
+        )
+    return pks, entries
+
+
+def _delete_rows(pks):
+    """
+    DELETE مستقیم با شناسه‌ها. QuerySet.delete() از Collector می‌گذرد که
+    ردیف‌ها را دوباره می‌خواند و برای هر کدام post_delete می‌فرستد (و
+    transaction_deleted برای هر ردیف ایندکس و داشبورد را جدا به‌روز می‌کند)؛
+    جمع‌ها و ایندکس اینجا یکجا به‌روز می‌شوند. هیچ جدولی به تراکنش FK ندارد،
+    پس cascade لازم نیست. حذف با همان شناسه‌هایی است که اثرشان از جمع‌ها
+    برگردانده شد.
+    """
+    table = Transaction._meta.db_table
+    deleted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(pks), DELETE_BATCH):
+            batch = pks[start : start + DELETE_BATCH]
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", batch)
+            deleted += cursor.rowcount
+    return deleted
+
+
+def delete(user, transactions):
+    """حذف تراکنش‌ها؛ تعداد حذف‌شده‌ها را برمی‌گرداند."""
+    with atomic():
+        pks, entries = _entries(transactions)
+        if not pks:
+            return 0
+        balances.post_entries(entries, sign=-1)
+        deleted = _delete_rows(pks)
+        search.unindex(search.TRANSACTION_TABLE, pks)
+    dashboard.invalidate(user.pk)
+    return deleted
+
+
+def update(user, transactions, category=None, day=None, account=None):
+    """
+    تغییر دسته (نام دسته)، تاریخ (روز، ساعت صفر) یا حساب تراکنش‌ها؛ account
+    باید از همان کاربر باشد. دسته تازه در همان transaction و فقط وقتی ردیفی
+    برای تغییر هست ساخته می‌شود. تعداد ردیف‌های تغییرکرده را برمی‌گرداند.
+    """
+    changes = {}
+    if day is not None:
+        changes["date"] = balances.day_start(day)
+    if account is not None:
+        changes["account_id"] = account.pk
+    if not changes and not category:
+        return 0
+
+    with atomic():
+        pks, entries = _entries(transactions)
+        if not pks:
+            return 0
+        if category:
+            category = categories.get_or_create(user.pk, category)
+            if category is not None:
+                changes["category_id"] = category.pk
+        if not changes:
+            return 0
+        balances.post_entries(entries, sign=-1)
+        updated = transactions.update(**changes)
+        balances.post_entries(
+            [
+                entry._replace(
+                    account_id=changes.get("account_id", entry.account_id),
+                    day=day or entry.day,
+                    category=changes.get("category_id", entry.category),
+                )
+                for entry in entries
+            ]
+        )
+        if account is not None:
+            # account_id در ایندکس جستجو ذخیره شده است
+            search.index_transactions(
+                Transaction.objects.filter(pk__in=pks).only("pk", "description", "account_id")
+            )
+    dashboard.invalidate(user.pk)
+    return updated
@@ -0,0 +1,84 @@
+"""
+دسته‌بندی‌های هر کاربر (Category) و جدول نام‌ها در cache.
+
+تراکنش‌ها و جمع‌های روزانه (CategoryDailyBalance) فقط شماره دسته را نگه
+می‌دارند؛ گروه‌بندی و فیلتر روی عدد انجام می‌شود و نام‌ها برای نمایش از
+names(user_id) خوانده می‌شوند که تا تغییر بعدی دسته‌های کاربر (سیگنال‌های
+home.signals) در cache می‌ماند.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Category
+
+CACHE_TIMEOUT = 24 * 60 * 60
+NONE = 0  # CategoryDailyBalance.category برای تراکنش بدون دسته
+
+_TRANSLATION = str.maketrans({"ي": "ی", "ى": "ی", "ك": "ک"})
+
+
+def clean_name(name):
+    """یکسان‌سازی نام برای جلوگیری از دسته‌های تکراری (فاصله‌ها، ی و ک عربی)."""
+    return " ".join(str(name or "").translate(_TRANSLATION).split())[:100]
+
+
+def cache_key(user_id):
+    return f"categories:{user_id}"
+
+
+def invalidate(user_id):
+    # بعد از commit، مثل dashboard.invalidate: دسته‌ای که rollback شود به cache نمی‌رسد
+    transaction.on_commit(lambda: cache.delete(cache_key(user_id)))
+
+
+def names(user_id):
+    """{شماره: نام} دسته‌های کاربر."""
+    key = cache_key(user_id)
+    data = cache.get(key)
+    if data is None:
+        data = dict(Category.objects.filter(user_id=user_id).values_list("pk", "name"))
+        cache.set(key, data, CACHE_TIMEOUT)
+    return data
+
+
+def name(user_id, category_id, default=""):
+    return names(user_id).get(category_id, default)
+
+
+def options(user_id):
+    """نام‌های مرتب برای پیشنهاد در فرم‌ها (CategoryInput)."""
+    return sorted(names(user_id).values())
+
+
+def get_or_create(user_id, raw_name):
+    """
+    Category (بدون کوئری اضافه اگر دسته از قبل هست) یا None برای نام خالی؛ مثل
+    resolve داخل همان atomic نوشتن تراکنش صدا زده شود.
+    """
+    name = clean_name(raw_name)
+    if not name:
+        return None
+    return Category(pk=resolve(user_id, [name])[name], user_id=user_id, name=name)
+
+
+def resolve(user_id, raw_names):
+    """
+    {نام ورودی: شماره دسته} برای چند نام؛ دسته‌های جدید یکجا ساخته می‌شوند.
+    نام خالی به None (بدون دسته) نگاشت می‌شود. داخل همان atomic نوشتن
+    تراکنش‌ها صدا زده شود تا با خطای بعدی، دسته بی‌مصرف باقی نماند.
+    """
+    cleaned = {raw: clean_name(raw) for raw in set(raw_names)}
+    ids = {name: pk for pk, name in names(user_id).items()}
+    missing = {name for name in cleaned.values() if name and name not in ids}
+    if missing:
+        Category.objects.bulk_create(
+            [Category(user_id=user_id, name=name) for name in missing],
+            ignore_conflicts=True,
+        )
+        # از خود جدول، نه names(): cache تا commit نباید دسته‌های تازه را ببیند
+        ids.update(
+            Category.objects.filter(user_id=user_id, name__in=missing).values_list("name", "pk")
+        )
+        invalidate(user_id)
+    return {raw: ids.get(name) for raw, name in cleaned.items()}
@@ -0,0 +1,99 @@
+"""
+GET شرطی (ETag / Last-Modified) برای لیست حساب‌ها، لیست تراکنش‌ها و دفتر حساب.
+
+ETag از نسخه حساب‌ها (AccountBalance.version) ساخته می‌شود و Last-Modified از
+updated_at همان ردیف‌ها؛ هر دو با یک کوئری روی AccountBalance خوانده می‌شوند و
+روی request می‌مانند تا خود view دوباره آن‌ها را نخواند. با If-None-Match
+برابر، پاسخ 304 بدون کوئری صفحه و بدون رندر قالب برمی‌گردد.
+
+دفتر حساب علاوه بر تراکنش‌های همان حساب، حساب‌های کاربر (حساب مقصد در فرم
+عملیات گروهی) و نام دسته‌ها (datalist) را هم نشان می‌دهد، پس ETag آن از
+نسخه همه حساب‌های کاربر و نام دسته‌ها ساخته می‌شود. فرم عملیات گروهی
+csrf_token هم دارد، پس راز CSRF (که login عوض می‌کند) هم در ETag آن است تا
+صفحه کش‌شده با توکن کهنه 304 نگیرد.
+
+وقتی پیامی (django.contrib.messages) در انتظار نمایش است ETag ساخته نمی‌شود،
+چون همان صفحه این بار با پیام رندر می‌شود.
+"""
+
+import hashlib
+
+from django.contrib.messages import get_messages
+from django.views.decorators.http import condition
+
+from .models import AccountBalance
+from . import balances, categories
+
+EMPTY_TOTALS = {
+    "total_income": 0,
+    "total_expense": 0,
+    "transaction_count": 0,
+    "version": 0,
+    "updated_at": None,
+}
+
+
+def _etag(request, state):
+    if get_messages(request):
+        return None
+    # صفحه و جستجو (query string) و کاربر (navbar) هم در پاسخ اثر دارند
+    key = repr((request.user.pk, request.get_full_path(), state))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def user_versions(request):
+    """balances.user_versions کاربر درخواست، یک بار برای هر درخواست."""
+    if not hasattr(request, "_user_versions"):
+        request._user_versions = balances.user_versions(request.user)
+    return request._user_versions
+
+
+def category_names(request):
+    """categories.names کاربر درخواست، یک بار برای هر درخواست."""
+    if not hasattr(request, "_category_names"):
+        request._category_names = categories.names(request.user.pk)
+    return request._category_names
+
+
+def account_totals(request, account_pk):
+    """balances.account_totals حساب درخواست (فقط حساب‌های همان کاربر)، یک بار برای هر درخواست."""
+    if not hasattr(request, "_account_totals"):
+        request._account_totals = _account_totals(request, account_pk).first()
+    return request._account_totals or EMPTY_TOTALS
+
+
+def _account_totals(request, account_pk):
+    return AccountBalance.objects.filter(
+        account_id=account_pk, account__user=request.user
+    ).values(*EMPTY_TOTALS)
+
+
+def list_etag(request, *args, **kwargs):
+    return _etag(request, [row[:2] for row in user_versions(request)])
+
+
+def list_last_modified(request, *args, **kwargs):
+    return max((row[3] for row in user_versions(request)), default=None)
+
+
+def ledger_etag(request, account_pk):
+    versions = [row[:2] for row in user_versions(request)]
+    # حساب کاربر دیگر یا حذف‌شده: بدون ETag تا view خودش 404 بدهد
+    if account_pk not in (row[0] for row in versions):
+        return None
+    # بدون کوکی CSRF، رندر صفحه راز تازه می‌سازد و ETag درخواست بعد فرق می‌کند
+    csrf_secret = request.META.get("CSRF_COOKIE")
+    return _etag(
+        request,
+        (account_pk, versions, sorted(category_names(request).items()), csrf_secret),
+    )
+
+
+def ledger_last_modified(request, account_pk):
+    # ایجاد دسته تازه updated_at ندارد؛ آن تغییر فقط از راه ETag دیده می‌شود
+    return list_last_modified(request)
+
+
+list_condition = condition(list_etag, list_last_modified)
+ledger_condition = condition(ledger_etag, ledger_last_modified)
+
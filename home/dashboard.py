@@ -0,0 +1,72 @@
+"""
+جمع‌های داشبورد هر کاربر در cache جنگو. با هر تغییر حساب یا تراکنش (سیگنال‌های
+home.signals) یا عملیات گروهی، invalidate صدا زده می‌شود (حذف پس از commit) و
+بار بعد دوباره محاسبه می‌شود؛ بارگذاری‌های تکراری هیچ کوئری aggregate ندارند.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import AccountBalance, AccountDailyBalance, CategoryDailyBalance
+from . import categories, jalali, reports
+
+CACHE_TIMEOUT = 60 * 60
+TOP_CATEGORIES = 5
+
+
+def cache_key(user_id, today=None):
+    # ماه شمسی در کلید است تا با شروع ماه جدید خودبه‌خود کلید عوض شود
+    start, _ = jalali.month_bounds(today or timezone.localdate())
+    return f"dashboard:{user_id}:{start.isoformat()}"
+
+
+def invalidate(user_id):
+    # بعد از commit: حذف داخل transaction نویسنده به خواننده‌ای که همان لحظه
+    # جمع‌های قبل از commit را می‌خواند فرصت می‌دهد آن‌ها را دوباره در cache بگذارد
+    transaction.on_commit(lambda: cache.delete(cache_key(user_id)))
+
+
+def compute(user, today=None):
+    today = today or timezone.localdate()
+    start, end = jalali.month_bounds(today)
+
+    totals = AccountBalance.objects.filter(account__user=user).aggregate(
+        income=Sum("total_income"), expense=Sum("total_expense")
+    )
+    month = AccountDailyBalance.objects.filter(
+        account__user=user, day__gte=start, day__lt=end
+    ).aggregate(income=Sum("total_income"), expense=Sum("total_expense"))
+    by_category = (
+        CategoryDailyBalance.objects.filter(
+            account__user=user, day__gte=start, day__lt=end, total_expense__gt=0
+        )
+        .values("category")
+        .annotate(total=Sum("total_expense"))
+        .order_by("-total")[:TOP_CATEGORIES]
+    )
+
+    names = categories.names(user.pk)
+    return {
+        "balance": (totals["income"] or 0) - (totals["expense"] or 0),
+        "month_label": jalali.month_label(today),
+        "month_income": month["income"] or 0,
+        "month_expense": month["expense"] or 0,
+        "top_categories": [
+            {
+                "category": names.get(row["category"], reports.NO_CATEGORY),
+                "total": row["total"],
+            }
+            for row in by_category
+        ],
+    }
+
+
+def get_dashboard(user):
+    key = cache_key(user.pk)
+    data = cache.get(key)
+    if data is None:
+        data = compute(user)
+        cache.set(key, data, CACHE_TIMEOUT)
+    return data
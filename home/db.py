@@ -0,0 +1,51 @@
+"""
+تکرار نوشتن‌ها وقتی SQLite قفل است ("database is locked").
+
+با transaction_mode=IMMEDIATE و timeout در settings، هر transaction خودش تا
+timeout برای قفل نوشتن صبر می‌کند؛ retry_on_busy فقط برای حالتی است که این
+زمان هم تمام شود. تابع باید همه نوشتن‌هایش را در یک atomic انجام دهد تا
+اجرای دوباره‌اش امن باشد، و داخل atomic بیرونی صدا زده نشود.
+"""
+
+import logging
+import random
+import time
+from functools import wraps
+
+from django.db import OperationalError, connection
+
+logger = logging.getLogger(__name__)
+
+ATTEMPTS = 5
+BASE_DELAY = 0.05
+
+
+def is_busy(error):
+    message = str(error).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+def retry_on_busy(func=None, *, attempts=ATTEMPTS, base_delay=BASE_DELAY):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as e:
+                    # داخل atomic بیرونی، transaction خراب شده و تکرار بی‌معناست
+                    if not is_busy(e) or attempt == attempts or connection.in_atomic_block:
+                        raise
+                    delay = base_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                    logger.warning(
+                        "%s: database busy, retry %d/%d in %.0fms",
+                        func.__qualname__,
+                        attempt,
+                        attempts - 1,
+                        delay * 1000,
+                    )
+                    time.sleep(delay)
+
+        return wrapper
+
+    return decorator(func) if func else decorator
@@ -0,0 +1,77 @@
+import csv
+
+from .models import Transaction
+from .templatetags.jalali_filters import jalali
+
+CHUNK_SIZE = 2000
+HEADER = ["شماره", "حساب", "نوع", "مبلغ", "تاریخ", "دسته‌بندی", "توضیحات", "مانده"]
+TYPE_LABELS = dict(Transaction.TRANSACTION_TYPES)
+# اکسل سلول متنی را که با این نویسه‌ها شروع شود فرمول حساب می‌کند
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class Echo:
+    """شیء شبه فایل برای csv.writer که سطر نوشته‌شده را برمی‌گرداند."""
+
+    def write(self, value):
+        return value
+
+
+def escape_text(value):
+    """متن سلول با ' در ابتدا اگر اکسل آن را فرمول بخواند؛ مبلغ‌ها عدد می‌مانند."""
+    value = value or ""
+    return "'" + value if value.startswith(FORMULA_PREFIXES) else value
+
+
+def unescape_text(value):
+    """برعکس escape_text، برای ورود دوباره همان فایل."""
+    if value and value[0] == "'" and value[1:].startswith(FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+def ledger_rows(transactions):
+    """
+    سطرهای دفتر به ترتیب (حساب، تاریخ، شماره) با مانده جاری هر حساب.
+
+    تراکنش‌ها با iterator و در تکه‌های CHUNK_SIZE خوانده می‌شوند، پس حافظه مستقل
+    از تعداد تراکنش‌ها ثابت می‌ماند.
+    """
+    rows = (
+        transactions.order_by("account_id", "date", "id")
+        .values_list(
+            "id",
+            "account_id",
+            "account__full_name",
+            "type",
+            "amount",
+            "date",
+            "category__name",
+            "description",
+        )
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    current_account, balance = None, 0
+    for pk, account_id, full_name, type_, amount, date, category, description in rows:
+        if account_id != current_account:
+            current_account, balance = account_id, 0
+        balance += amount if type_ == "RE" else -amount
+        yield [
+            pk,
+            escape_text(full_name),
+            TYPE_LABELS.get(type_, type_),
+            amount,
+            jalali(date),
+            escape_text(category),
+            escape_text(description),
+            balance,
+        ]
+
+
+def csv_stream(rows):
+    writer = csv.writer(Echo())
+    # BOM تا اکسل متن فارسی را درست نشان دهد؛ قبل از اجرای کوئری فرستاده می‌شود
+    yield "\ufeff"
+    yield writer.writerow(HEADER)
+    for row in rows:
+        yield writer.writerow(row)
@@ -1,10 +1,35 @@
 from django import forms
 from .models import Account, Transaction
-from django.utils import timezone
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
-from khayyam import JalaliDate
 from .validators import validate_custom_date_format
+from . import categories, jalali
+
+
+class CategoryInput(forms.TextInput):
+    """ورودی متنی دسته با پیشنهاد دسته‌های موجود کاربر (datalist)."""
+
+    template_name = "home/widgets/category_input.html"
+
+    def __init__(self, attrs=None):
+        super().__init__({"class": "form-control", "dir": "rtl", **(attrs or {})})
+        self.options = []
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        widget = context["widget"]
+        widget["attrs"]["list"] = f"{widget['attrs'].get('id', name)}-options"
+        widget["options"] = self.options
+        return context
+
+
+def category_field():
+    return forms.CharField(
+        label="دسته",
+        max_length=100,
+        required=False,
+        widget=CategoryInput(attrs={"placeholder": "دسته را انتخاب یا وارد کنید"}),
+    )
 
 
 class AccountForm(forms.ModelForm):
@@ -48,10 +73,6 @@ class AccountForm(forms.ModelForm):
 
 
 class TransactionForm(forms.ModelForm):
-    now = timezone.now().date()
-    jalali_date = JalaliDate(now)  # یا: JalaliDate.fromdate(now)
-    formatted = f"{jalali_date.year}/{jalali_date.month:02}/{jalali_date.day:02}"
-
     date = forms.CharField(
         label="تاریخ",
         max_length=10,
@@ -63,8 +84,30 @@ class TransactionForm(forms.ModelForm):
                 "dir": "rtl",
             }
         ),
-        initial=formatted,
+        # callable تا پیش‌فرض در هر نمایش فرم حساب شود، نه یک بار هنگام import
+        initial=jalali.today,
     )
+    category = category_field()
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user = user
+        if user is not None:
+            self.fields["category"].widget.options = categories.options(user.pk)
+            if self.instance.category_id:
+                self.initial.setdefault(
+                    "category", categories.name(user.pk, self.instance.category_id)
+                )
+
+    def clean_category(self):
+        return categories.clean_name(self.cleaned_data.get("category"))
+
+    def save(self, commit=True):
+        # دسته تازه فقط برای فرم معتبر ساخته می‌شود، نه هنگام اعتبارسنجی
+        self.instance.category = categories.get_or_create(
+            self.user.pk, self.cleaned_data.get("category")
+        )
+        return super().save(commit)
 
     def clean_date(self):
         value = self.cleaned_data.get("date")
@@ -77,11 +120,7 @@ class TransactionForm(forms.ModelForm):
 
         try:
             year, month, day = map(int, parts)
-            jalali_date = JalaliDate(year, month, day)
-            gregorian_date = jalali_date.todate()
-            print("*" * 90)
-            print(gregorian_date)
-            return gregorian_date
+            return jalali.to_gregorian(year, month, day)
         except ValueError:
             raise forms.ValidationError("فرمت تاریخ اشتباه است.")
         except Exception:
@@ -90,6 +129,7 @@ class TransactionForm(forms.ModelForm):
     class Meta:
         model = Transaction
         fields = ["amount", "date", "description"]  # حذف type چون در exclude بود
+        # category فیلد فرم است نه مدل؛ Category در save ساخته یا پیدا می‌شود
         labels = {
             "amount": "مبلغ",
             "date": "تاریخ",
@@ -114,6 +154,153 @@ class TransactionForm(forms.ModelForm):
         }
 
 
+class ImportTransactionsForm(forms.Form):
+    file = forms.FileField(
+        label="فایل CSV یا JSON",
+        widget=forms.ClearableFileInput(
+            attrs={"class": "form-control", "accept": ".csv,.json,.jsonl"}
+        ),
+    )
+    account = forms.ModelChoiceField(
+        label="حساب (اختیاری)",
+        queryset=Account.objects.none(),
+        required=False,
+        empty_label="از ستون حساب در فایل",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["account"].queryset = Account.objects.filter(user=user)
+
+    def clean_file(self):
+        file = self.cleaned_data["file"]
+        extension = file.name.rsplit(".", 1)[-1].lower()
+        if extension not in ("csv", "json", "jsonl"):
+            raise forms.ValidationError("فقط فایل‌های CSV یا JSON پذیرفته می‌شوند.")
+        return file
+
+
+class ReportForm(forms.Form):
+    PERIOD_CHOICES = [
+        ("month", "ماهانه"),
+        ("quarter", "فصلی"),
+        ("year", "سالانه"),
+    ]
+
+    period = forms.ChoiceField(
+        label="دوره",
+        choices=PERIOD_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    year = forms.IntegerField(
+        label="سال",
+        min_value=1300,
+        max_value=1500,
+        required=False,
+        widget=forms.NumberInput(attrs={"class": "form-control", "dir": "rtl"}),
+    )
+    account = forms.ModelChoiceField(
+        label="حساب",
+        queryset=Account.objects.none(),
+        required=False,
+        empty_label="همه حساب‌ها",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    start = forms.CharField(
+        label="از تاریخ",
+        max_length=10,
+        required=False,
+        validators=[validate_custom_date_format],
+        widget=forms.TextInput(
+            attrs={"placeholder": "مثلاً 1402/01/01", "class": "form-control", "dir": "rtl"}
+        ),
+    )
+    end = forms.CharField(
+        label="تا تاریخ",
+        max_length=10,
+        required=False,
+        validators=[validate_custom_date_format],
+        widget=forms.TextInput(
+            attrs={"placeholder": "مثلاً 1402/12/29", "class": "form-control", "dir": "rtl"}
+        ),
+    )
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["account"].queryset = Account.objects.filter(user=user)
+
+    def clean_start(self):
+        value = self.cleaned_data.get("start")
+        return jalali.parse(value) if value else None
+
+    def clean_end(self):
+        value = self.cleaned_data.get("end")
+        return jalali.parse(value) if value else None
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get("start"), cleaned_data.get("end")
+        if bool(start) != bool(end) and not self.errors:
+            raise forms.ValidationError("برای بازه دلخواه هر دو تاریخ را وارد کنید.")
+        if start and end and start > end:
+            raise forms.ValidationError("تاریخ شروع باید قبل از تاریخ پایان باشد.")
+        return cleaned_data
+
+
+class BulkTransactionsForm(forms.Form):
+    ACTION_CHOICES = [
+        ("delete", "حذف"),
+        ("category", "تغییر دسته"),
+        ("date", "تغییر تاریخ"),
+        ("move", "انتقال به حساب"),
+    ]
+
+    action = forms.ChoiceField(
+        label="عملیات",
+        choices=ACTION_CHOICES,
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    category = category_field()
+    date = forms.CharField(
+        label="تاریخ",
+        max_length=10,
+        required=False,
+        validators=[validate_custom_date_format],
+        widget=forms.TextInput(
+            attrs={"placeholder": "مثلاً 1402/07/18", "class": "form-control", "dir": "rtl"}
+        ),
+    )
+    account = forms.ModelChoiceField(
+        label="حساب مقصد",
+        queryset=Account.objects.none(),
+        required=False,
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["account"].queryset = Account.objects.filter(user=user)
+        if user is not None:
+            self.fields["category"].widget.options = categories.options(user.pk)
+
+    def clean_category(self):
+        return categories.clean_name(self.cleaned_data.get("category"))
+
+    def clean_date(self):
+        value = self.cleaned_data.get("date")
+        return jalali.parse(value) if value else None
+
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get("action")
+        required = {"category": "category", "date": "date", "move": "account"}.get(action)
+        if required and not cleaned_data.get(required) and required not in self.errors:
+            self.add_error(required, "برای این عملیات مقدار لازم است.")
+        return cleaned_data
+
+
 class SignUpForm(UserCreationForm):
     class Meta:
         model = User
@@ -0,0 +1,39 @@
+"""
+cache HTML جدول صفحات دفتر حساب و لیست تراکنش‌ها.
+
+کلیدها شامل AccountBalance.version حساب(ها) هستند که با هر ثبت/ویرایش/حذف
+تراکنش (balances.post_entries) و ویرایش حساب زیاد می‌شود؛ پس هیچ‌وقت لازم
+نیست کلیدی پاک شود و مقدارهای قدیمی خودشان منقضی می‌شوند. در صورت hit نه
+کوئری صفحه اجرا می‌شود و نه قالب ردیف‌ها رندر می‌شود.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+TIMEOUT = 24 * 3600
+
+
+def _digest(*parts):
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def ledger_key(account_id, version, after=None, before=None):
+    return f"ledger:{account_id}:{version}:{_digest(after or '', before or '')}"
+
+
+def transactions_key(user_id, versions, page=None, query=""):
+    # versions: balances.user_versions
+    state = [row[:2] for row in versions]
+    return f"transactions:{user_id}:{_digest(state, page or '', query)}"
+
+
+def render_cached(key, template_name, context):
+    """context تابعی است که فقط در صورت miss صدا زده می‌شود."""
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(template_name, context())
+        cache.set(key, html, TIMEOUT)
+    return html
+
@@ -0,0 +1,309 @@
+"""
+ورود گروهی تراکنش‌ها از CSV یا JSON (از جمله خروجی dumpdata مثل transactions.json).
+
+فایل به صورت جریانی خوانده و در دسته‌های batch_size پردازش می‌شود: تاریخ‌های
+هر دسته یکجا اعتبارسنجی می‌شوند و ردیف‌های معتبر با bulk_create در یک
+transaction ثبت می‌شوند، همراه با به‌روزرسانی جمع‌های حساب و ایندکس جستجو.
+ردیف‌های نامعتبر رد و با شماره ردیف گزارش می‌شوند.
+"""
+
+import csv
+import io
+import json
+import re
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db.transaction import atomic
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .db import retry_on_busy
+from .export import unescape_text
+from .models import Account, Transaction
+from .validators import DATE_PATTERN, RANGE_MESSAGE, validate_jalali_dates
+from . import balances, categories, dashboard, search
+
+BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+_DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "0123456789" * 2)
+# ماه و روز یک‌رقمی (1402/7/8)
+SHORT_DATE = re.compile(r"^(\d{4})([-/])(\d{1,2})[-/](\d{1,2})$")
+# سال‌های کوچک‌تر شمسی‌اند؛ مسیر میلادی آن‌ها را نمی‌پذیرد
+MIN_GREGORIAN_YEAR = 1700
+
+# نام ستون‌ها: انگلیسی، خروجی CSV خود برنامه و فیلدهای dumpdata
+COLUMNS = {
+    "account": "account",
+    "حساب": "account",
+    "type": "type",
+    "نوع": "type",
+    "amount": "amount",
+    "مبلغ": "amount",
+    "date": "date",
+    "تاریخ": "date",
+    "category": "category",
+    "دسته‌بندی": "category",
+    "description": "description",
+    "توضیحات": "description",
+}
+TYPES = {
+    "re": "RE",
+    "ex": "EX",
+    "دریافت": "RE",
+    "پرداخت": "EX",
+}
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    accounts_created: int = 0
+    rows: int = 0
+    errors: list = field(default_factory=list)
+    error_count: int = 0
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def iter_csv(fp):
+    reader = csv.DictReader(fp)
+    for line, row in enumerate(reader, start=2):
+        yield line, {
+            # سلول‌های متنی که خروجی CSV برای اکسل با ' شروع کرده است
+            COLUMNS.get(key.strip().lstrip("\ufeff"), key): unescape_text(value)
+            for key, value in row.items()
+            if key
+        }
+
+
+def iter_json(fp, chunk_size=64 * 1024):
+    """
+    خواندن جریانی یک آرایه JSON (یا JSON Lines) بدون بارگذاری کل فایل:
+    اشیا یکی‌یکی با raw_decode از بافر جدا می‌شوند.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    line = 0
+    started = False
+    while True:
+        chunk = fp.read(chunk_size)
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,\ufeff":
+                position += 1
+            if not started and position < len(buffer) and buffer[position] == "[":
+                position += 1
+                started = True
+                continue
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                obj, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if not chunk:
+                    if buffer[position:].strip():
+                        raise ValidationError("فایل JSON ناقص یا نامعتبر است.")
+                    return
+                break
+            line += 1
+            position = end
+            yield line, obj
+        if not chunk:
+            return
+
+
+def read_rows(fp, fmt):
+    if isinstance(fp.read(0), bytes):
+        fp = io.TextIOWrapper(fp, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        return iter_csv(fp)
+    if fmt == "json":
+        return iter_json(fp)
+    raise ValidationError(f"فرمت {fmt} پشتیبانی نمی‌شود.")
+
+
+class TransactionImporter:
+    def __init__(self, user, account=None, batch_size=BATCH_SIZE):
+        self.user = user
+        self.account = account
+        self.batch_size = batch_size
+        self.result = ImportResult()
+        accounts = Account.objects.filter(user=user).values_list("pk", "full_name")
+        self.account_ids = {pk for pk, _ in accounts}
+        self.account_names = {name: pk for pk, name in accounts}
+        # شماره حساب‌های فایل dumpdata -> حساب ساخته‌شده برای این کاربر
+        self.remapped = {}
+        self.day_starts = {}
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                # bulk_create سیگنال post_save ندارد
+                dashboard.invalidate(self.user.pk)
+                return self.result
+            self.process(batch)
+
+    def process(self, batch):
+        records = []
+        for line, obj in batch:
+            self.result.rows += 1
+            if not isinstance(obj, dict):
+                self.result.add_error(line, "هر ردیف باید یک شیء JSON باشد.")
+                continue
+            if "model" in obj and "fields" in obj:
+                # قالب dumpdata
+                if obj["model"] == "home.account":
+                    self.create_account(obj)
+                    continue
+                if obj["model"] != "home.transaction":
+                    continue
+                obj = obj["fields"]
+            records.append((line, obj))
+
+        dates = validate_jalali_dates(
+            self.clean_date(obj.get("date"))
+            for _, obj in records
+            if self.is_jalali(obj.get("date"))
+        )
+
+        transactions, names = [], []
+        for line, obj in records:
+            try:
+                transactions.append(self.build(obj, dates))
+            except ValidationError as e:
+                self.result.add_error(line, "؛ ".join(e.messages))
+            else:
+                names.append(self.category_name(obj.get("category")))
+
+        if not transactions:
+            return
+        self.write(transactions, names)
+        self.result.created += len(transactions)
+
+    @retry_on_busy
+    def write(self, transactions, names):
+        with atomic():
+            # دسته‌های تازه کل دسته با یک INSERT و در همان transaction ساخته می‌شوند
+            category_ids = categories.resolve(self.user.pk, names)
+            for transaction, name in zip(transactions, names):
+                transaction.category_id = category_ids[name]
+            Transaction.objects.bulk_create(transactions, batch_size=self.batch_size)
+            balances.post_entries(map(balances.entry, transactions))
+            search.index_transactions(transactions, new=True)
+
+    def create_account(self, obj):
+        fields = obj["fields"]
+        account = Account.objects.create(
+            user=self.user,
+            full_name=fields.get("full_name") or "",
+            email=fields.get("email"),
+            phone_number=fields.get("phone_number"),
+            address=fields.get("address"),
+        )
+        self.remapped[obj.get("pk")] = account.pk
+        self.account_ids.add(account.pk)
+        self.account_names.setdefault(account.full_name, account.pk)
+        self.result.accounts_created += 1
+
+    @staticmethod
+    def clean_date(value):
+        """ارقام فارسی و عربی به لاتین و ماه و روز دورقمی."""
+        value = str(value or "").translate(_DIGITS).strip()
+        match = SHORT_DATE.match(value)
+        if match:
+            year, separator, month, day = match.groups()
+            value = f"{year}{separator}{int(month):02}{separator}{int(day):02}"
+        return value
+
+    @classmethod
+    def is_jalali(cls, value):
+        value = cls.clean_date(value)
+        return bool(DATE_PATTERN.match(value)) and int(value[:4]) < MIN_GREGORIAN_YEAR
+
+    def resolve_account(self, value):
+        if self.account is not None:
+            return self.account.pk
+        if value in (None, ""):
+            raise ValidationError("حساب مشخص نشده است.")
+        if isinstance(value, int) or str(value).translate(_DIGITS).isdigit():
+            pk = int(str(value).translate(_DIGITS))
+            pk = self.remapped.get(pk, pk)
+            if pk in self.account_ids:
+                return pk
+        elif str(value).strip() in self.account_names:
+            return self.account_names[str(value).strip()]
+        raise ValidationError(f"حساب «{value}» پیدا نشد.")
+
+    def category_name(self, value):
+        if isinstance(value, int):
+            # شماره دسته در خروجی dumpdata؛ فقط دسته‌های همین کاربر
+            return categories.name(self.user.pk, value)
+        return str(value or "")
+
+    def build(self, obj, dates):
+        errors = []
+
+        try:
+            account_id = self.resolve_account(obj.get("account"))
+        except ValidationError as e:
+            errors.extend(e.messages)
+
+        type_ = str(obj.get("type") or "").strip()
+        type_ = TYPES.get(type_.lower(), type_.upper())
+        if type_ not in ("RE", "EX"):
+            errors.append("نوع تراکنش باید دریافت (RE) یا پرداخت (EX) باشد.")
+
+        try:
+            raw = str(obj.get("amount") or "").translate(_DIGITS).replace(",", "")
+            amount = Decimal(raw.strip())
+            if amount <= 0 or amount != amount.to_integral_value() or len(str(int(amount))) > 15:
+                raise InvalidOperation
+        except (InvalidOperation, OverflowError, ValueError):
+            errors.append("مبلغ نامعتبر است.")
+
+        value = self.clean_date(obj.get("date"))
+        if self.is_jalali(value):
+            date = dates[value]
+        else:
+            try:
+                date = parse_datetime(value) or parse_date(value)
+            except ValueError:  # قالب درست ولی تاریخ ناممکن، مثل 2023-02-30
+                date = None
+            if date is None:
+                date = ValidationError("تاریخ وارد شده معتبر نیست یا قابل تبدیل نیست.")
+            elif date.year < MIN_GREGORIAN_YEAR:
+                date = ValidationError(RANGE_MESSAGE)
+        if isinstance(date, ValidationError):
+            errors.extend(date.messages)
+        elif not hasattr(date, "hour"):
+            if date not in self.day_starts:
+                self.day_starts[date] = balances.day_start(date)
+            date = self.day_starts[date]
+        elif timezone.is_naive(date):
+            # parse_datetime برای "2023-10-11" هم datetime بدون منطقه زمانی می‌دهد
+            date = timezone.make_aware(date)
+
+        if errors:
+            raise ValidationError(errors)
+        return Transaction(
+            account_id=account_id,
+            type=type_,
+            amount=amount,
+            date=date,
+            description=obj.get("description") or None,
+        )
+
+
+def import_transactions(fp, fmt, user, account=None, batch_size=BATCH_SIZE):
+    return TransactionImporter(user, account, batch_size).run(read_rows(fp, fmt))
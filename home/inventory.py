@@ -0,0 +1,129 @@
+"""
+موجودی کالاها (Product.stock) و ردیف‌های StockMovement.
+
+هر تغییر موجودی یک UPDATE اتمی با F() است، نه خواندن و نوشتن دوباره در پایتون،
+پس فروش‌های همزمان تغییر یکدیگر را بازنویسی نمی‌کنند. خروج فقط با شرط
+stock >= مقدار انجام می‌شود و اگر ردیفی تغییر نکند موجودی کافی نبوده است.
+
+post_invoice همه اقلام یک فاکتور را در یک transaction ثبت می‌کند و ردیف‌های
+StockMovement (اقلام فاکتور) را با یک bulk_create می‌سازد. با lock=True به جای
+یک UPDATE برای هر کالا، کالاها یکجا با select_for_update قفل و با یک
+bulk_update نوشته می‌شوند؛ برای دیتابیس‌هایی با قفل سطری مثل PostgreSQL. در
+SQLite خود BEGIN IMMEDIATE (settings) کل دیتابیس را قفل می‌کند.
+"""
+
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
+from django.db.transaction import atomic
+
+from .models import Invoice, Product, StockMovement
+
+SALE, PURCHASE = "SA", "PU"
+
+
+class InsufficientStock(ValidationError):
+    def __init__(self, product_id, requested):
+        super().__init__(f"موجودی کالای {product_id} برای {requested} واحد کافی نیست.")
+        self.product_id = product_id
+        self.requested = requested
+
+
+def _apply(user, product_id, quantity):
+    """تغییر علامت‌دار موجودی با یک UPDATE؛ False اگر کالا نیست یا موجودی کم است."""
+    products = Product.objects.filter(user=user, pk=product_id)
+    if quantity < 0:
+        products = products.filter(stock__gte=-quantity)
+    return products.update(stock=F("stock") + quantity) == 1
+
+
+def _fail(user, product_id, requested):
+    if not Product.objects.filter(user=user, pk=product_id).exists():
+        raise ValidationError(f"کالای {product_id} پیدا نشد.")
+    raise InsufficientStock(product_id, requested)
+
+
+def move(user, product_id, quantity, kind="ADJ", unit_price=0):
+    """یک تغییر موجودی خارج از فاکتور (ورود، خروج یا اصلاح)؛ quantity علامت‌دار."""
+    with atomic():
+        if not _apply(user, product_id, quantity):
+            _fail(user, product_id, -quantity)
+        return StockMovement.objects.create(
+            product_id=product_id, kind=kind, quantity=quantity, unit_price=unit_price
+        )
+
+
+def _apply_locked(user, totals, sign):
+    products = list(
+        Product.objects.select_for_update()
+        .filter(user=user, pk__in=totals)
+        .order_by("pk")
+    )
+    missing = totals.keys() - {product.pk for product in products}
+    if missing:
+        raise ValidationError(f"کالای {min(missing)} پیدا نشد.")
+    for product in products:
+        product.stock += sign * totals[product.pk]
+        if product.stock < 0:
+            raise InsufficientStock(product.pk, totals[product.pk])
+    Product.objects.bulk_update(products, ["stock"])
+
+
+def post_invoice(user, kind, lines, account=None, lock=False):
+    """
+    ثبت فاکتور فروش (SALE) یا خرید (PURCHASE). lines لیست
+    (product_id, quantity, unit_price) با quantity مثبت است. اگر موجودی یکی از
+    اقلام کافی نباشد هیچ چیز ثبت نمی‌شود (InsufficientStock).
+    """
+    if kind not in (SALE, PURCHASE):
+        raise ValidationError("نوع فاکتور نامعتبر است.")
+    lines = list(lines)
+    if not lines:
+        raise ValidationError("فاکتور بدون قلم است.")
+    totals = defaultdict(int)
+    for product_id, quantity, unit_price in lines:
+        if quantity <= 0:
+            raise ValidationError("تعداد هر قلم باید مثبت باشد.")
+        totals[product_id] += quantity
+
+    sign = -1 if kind == SALE else 1
+    with atomic():
+        if lock:
+            _apply_locked(user, totals, sign)
+        else:
+            # ترتیب ثابت تا دو فاکتور همزمان کالاها را برعکس هم قفل نکنند
+            for product_id in sorted(totals):
+                if not _apply(user, product_id, sign * totals[product_id]):
+                    _fail(user, product_id, totals[product_id])
+
+        invoice = Invoice.objects.create(
+            user=user,
+            account=account,
+            kind=kind,
+            total=sum(quantity * unit_price for _, quantity, unit_price in lines),
+        )
+        StockMovement.objects.bulk_create(
+            StockMovement(
+                product_id=product_id,
+                invoice=invoice,
+                kind="OUT" if kind == SALE else "IN",
+                quantity=sign * quantity,
+                unit_price=unit_price,
+            )
+            for product_id, quantity, unit_price in lines
+        )
+    return invoice
+
+
+def verify(products=None):
+    """کالاهایی که stock آن‌ها با جمع StockMovementها برابر نیست: (pk, stock, جمع)."""
+    queryset = Product.objects.all()
+    if products is not None:
+        queryset = queryset.filter(pk__in=products)
+    return list(
+        queryset.annotate(moved=Coalesce(Sum("movements__quantity"), 0))
+        .exclude(stock=F("moved"))
+        .values_list("pk", "stock", "moved")
+    )
@@ -0,0 +1,101 @@
+"""
+تبدیل تاریخ شمسی/میلادی برای فیلترها، فرم‌ها، validatorها و viewها.
+
+تبدیل با khayyam نسبتا گران است و در یک صفحه دفتر یا یک فایل ورودی تاریخ‌ها
+زیاد تکرار می‌شوند، پس نتیجه هر روز در یک LRU cache محدود نگه داشته می‌شود.
+خود khayyam هم در اولین تبدیل import می‌شود نه هنگام import این ماژول (که
+forms، validators و template tagها در مسیر بالا آمدن پروسه import می‌کنند).
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from django.utils import timezone
+
+CACHE_SIZE = 4096
+DATE_PATTERN = re.compile(r"^\d{4}[-/]\d{2}[-/]\d{2}$")
+
+
+def _jalali_date(*args):
+    from khayyam import JalaliDate
+
+    return JalaliDate(*args)
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    return value
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _format(day):
+    jalali_date = _jalali_date(day)
+    return f"{jalali_date.year:04}/{jalali_date.month:02}/{jalali_date.day:02}"
+
+
+def format_date(value):
+    """تاریخ یا datetime میلادی به رشته شمسی YYYY/MM/DD."""
+    if not value:
+        return ""
+    return _format(_as_date(value))
+
+
+def today():
+    """تاریخ امروز (منطقه زمانی جاری) به شمسی؛ هنگام هر فراخوانی، نه import."""
+    return format_date(timezone.localdate())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def to_gregorian(year, month, day):
+    """تاریخ شمسی به date میلادی؛ برای تاریخ نامعتبر ValueError."""
+    return _jalali_date(year, month, day).todate()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse(value):
+    """رشته شمسی YYYY/MM/DD یا YYYY-MM-DD به date میلادی؛ در غیر این صورت ValueError."""
+    if not DATE_PATTERN.match(value):
+        raise ValueError(value)
+    year, month, day = map(int, re.split(r"[-/]", value))
+    return to_gregorian(year, month, day)
+
+
+def cache_info():
+    return {
+        "format": _format.cache_info()._asdict(),
+        "parse": parse.cache_info()._asdict(),
+        "to_gregorian": to_gregorian.cache_info()._asdict(),
+    }
+
+
+MONTH_NAMES = [
+    "فروردین",
+    "اردیبهشت",
+    "خرداد",
+    "تیر",
+    "مرداد",
+    "شهریور",
+    "مهر",
+    "آبان",
+    "آذر",
+    "دی",
+    "بهمن",
+    "اسفند",
+]
+
+
+def month_bounds(value):
+    """(اولین روز ماه شمسی value، اولین روز ماه بعد) به تاریخ میلادی."""
+    jalali_date = _jalali_date(_as_date(value))
+    year, month = jalali_date.year, jalali_date.month
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return to_gregorian(year, month, 1), to_gregorian(next_year, next_month, 1)
+
+
+def month_label(value):
+    jalali_date = _jalali_date(_as_date(value))
+    return f"{MONTH_NAMES[jalali_date.month - 1]} {jalali_date.year}"
@@ -0,0 +1,136 @@
+from django.db.models import Case, DecimalField, F, Q, Sum, When, Window
+from django.utils.dateparse import parse_datetime
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .balances import day_start, net_before_day, to_day
+
+
+PAGE_SIZE = 20
+
+# مبلغ علامت‌دار: دریافت مثبت، پرداخت منفی
+SIGNED_AMOUNT = Case(
+    When(type="RE", then=F("amount")),
+    default=-F("amount"),
+    output_field=DecimalField(max_digits=15, decimal_places=0),
+)
+
+
+def encode_key(date, pk):
+    return urlsafe_base64_encode(f"{date.isoformat()}|{pk}".encode())
+
+
+def encode_cursor(transaction):
+    return encode_key(transaction.date, transaction.pk)
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        date, pk = urlsafe_base64_decode(cursor).decode().rsplit("|", 1)
+        date, pk = parse_datetime(date), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if date is None:
+        return None
+    return date, pk
+
+
+def after_q(date, pk):
+    return Q(date__gt=date) | Q(date=date, pk__gt=pk)
+
+
+def before_q(date, pk):
+    return Q(date__lt=date) | Q(date=date, pk__lt=pk)
+
+
+def balance_before(transactions, date, pk, account_id):
+    """
+    مانده حساب قبل از تراکنش (date, pk) به ترتیب دفتر: مانده ابتدای روز از
+    جمع‌های ذخیره‌شده (net_before_day) و بقیه از تراکنش‌های همان روز.
+    """
+    day = to_day(date)
+    same_day = transactions.filter(date__gte=day_start(day)).filter(
+        before_q(date, pk)
+    )
+    total = same_day.aggregate(total=Sum(SIGNED_AMOUNT))["total"]
+    return net_before_day(account_id, day) + (total or 0)
+
+
+class LedgerPage:
+    """یک صفحه از دفتر حساب که با cursor (به جای شماره صفحه) پیمایش می‌شود."""
+
+    def __init__(self, object_list, has_previous, has_next):
+        self.object_list = object_list
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return encode_cursor(self.object_list[0])
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return encode_cursor(self.object_list[-1])
+
+
+def ledger_page(transactions, after=None, before=None, page_size=PAGE_SIZE):
+    """
+    یک صفحه از تراکنش‌ها به ترتیب (date, id) همراه با مانده هر ردیف.
+
+    بدون cursor آخرین صفحه (جدیدترین تراکنش‌ها) برگردانده می‌شود. مانده‌ها در
+    دیتابیس با Window Sum روی همین صفحه محاسبه و به مانده قبل از صفحه اضافه
+    می‌شوند. مانده قبل از صفحه از مانده کل حساب منهای روزهای بعد از صفحه است
+    (net_before_day)، پس صفحه‌های اخیر به طول تاریخچه بستگی ندارند.
+    """
+    after, before = decode_cursor(after), decode_cursor(before)
+    if after:
+        keys = transactions.filter(after_q(*after)).order_by("date", "id")
+    elif before:
+        keys = transactions.filter(before_q(*before)).order_by("-date", "-id")
+    else:
+        keys = transactions.order_by("-date", "-id")
+
+    pks = list(keys.values_list("pk", flat=True)[: page_size + 1])
+    has_more = len(pks) > page_size
+    pks = pks[:page_size]
+    if after:
+        has_previous, has_next = True, has_more
+    else:
+        has_previous, has_next = has_more, before is not None
+
+    rows = list(
+        transactions.filter(pk__in=pks)
+        .annotate(
+            running=Window(
+                Sum(SIGNED_AMOUNT),
+                order_by=[F("date").asc(), F("id").asc()],
+            )
+        )
+        .order_by("date", "id")
+    )
+    if rows:
+        first = rows[0]
+        anchor = balance_before(
+            transactions, first.date, first.pk, first.account_id
+        )
+        for txn in rows:
+            txn.balance = anchor + txn.running
+
+    return LedgerPage(rows, has_previous, has_next)
@@ -0,0 +1,73 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from home.bench import bench_database, percentiles, seed
+
+PROFILES = {
+    # تنظیمات پیش‌فرض جنگو: session از جدول django_session و کاربر از auth_user
+    "db": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+        "AUTHENTICATION_BACKENDS": ["django.contrib.auth.backends.ModelBackend"],
+    },
+    # تنظیمات با ACCOUNTING_SESSION_CACHE (اینجا روی cache مستعار sessions همین پروسه)
+    "cached": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.cached_db",
+        "AUTHENTICATION_BACKENDS": ["home.auth.CachedModelBackend"],
+    },
+}
+AUTH_TABLES = ("django_session", "auth_user")
+
+
+class Command(BaseCommand):
+    help = (
+        "کوئری‌های session و کاربر در هر درخواست کاربر واردشده (با cache گرم) و "
+        "زمان پاسخ، برای session/کاربر از دیتابیس در برابر cached_db و "
+        "home.auth.CachedModelBackend"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--url", default="home:accounts")
+        parser.add_argument(
+            "--db",
+            default=str(settings.BASE_DIR / "bench_auth.sqlite3"),
+            help="فایل دیتابیس بنچمارک (دیتابیس اصلی دست نمی‌خورد)",
+        )
+
+    def handle(self, *args, **options):
+        report = {}
+        with override_settings(ALLOWED_HOSTS=["testserver"]), bench_database(options["db"]):
+            user, _ = seed(accounts=5, transactions=100)[0]
+            url = reverse(options["url"])
+            for name, profile in PROFILES.items():
+                with override_settings(**profile):
+                    report[name] = self.run(user, url, options["requests"])
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, user, url, requests):
+        client = Client()
+        client.force_login(user)
+        client.get(url)  # گرم کردن cache
+        latencies, auth_queries, total_queries = [], 0, 0
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                client.get(url)
+                latencies.append((time.perf_counter() - start) * 1000)
+            total_queries += len(ctx)
+            auth_queries += sum(
+                any(table in query["sql"] for table in AUTH_TABLES)
+                for query in ctx.captured_queries
+            )
+        return {
+            "auth_queries_per_request": auth_queries / requests,
+            "queries_per_request": total_queries / requests,
+            **percentiles(latencies),
+        }
@@ -0,0 +1,92 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+
+from home.bench import bench_database, seed, timed
+from home.ledger import after_q
+from home.models import Account, Transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "مقایسه query plan و زمان کوئری‌های اصلی تراکنش‌ها با و بدون ایندکس‌های "
+        "Transaction.Meta.indexes روی یک دیتابیس SQLite جداگانه و پر شده"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--accounts", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--db",
+            default=str(settings.BASE_DIR / "bench_indexes.sqlite3"),
+            help="فایل دیتابیس بنچمارک (دیتابیس اصلی دست نمی‌خورد)",
+        )
+        parser.add_argument(
+            "--reuse",
+            action="store_true",
+            help="استفاده از دیتابیس پر شده قبلی به جای ساخت دوباره",
+        )
+
+    def handle(self, *args, **options):
+        with bench_database(options["db"], fresh=not options["reuse"]) as connection:
+            if not Transaction.objects.exists():
+                per_account = max(1, options["rows"] // options["accounts"])
+                seed(accounts=options["accounts"], transactions=per_account)
+
+            account = Account.objects.order_by("id")[Account.objects.count() // 2]
+            middle = account.transactions.order_by("date", "id")[
+                account.transactions.count() // 2
+            ]
+            shapes = {
+                # TransactionsView
+                "user_transactions": Transaction.objects.filter(
+                    account__user=account.user
+                ).order_by("-created_at")[:20],
+                "account_recent": Transaction.objects.filter(account=account).order_by(
+                    "-created_at"
+                )[:20],
+                # AccountTransactionsView / ledger_page
+                "ledger_latest_keys": account.transactions.order_by(
+                    "-date", "-id"
+                ).values_list("pk", flat=True)[:21],
+                "ledger_cursor_keys": account.transactions.filter(
+                    after_q(middle.date, middle.pk)
+                )
+                .order_by("date", "id")
+                .values_list("pk", flat=True)[:21],
+                "account_type_total": account.transactions.filter(type="RE"),
+            }
+
+            report = {
+                "rows": Transaction.objects.count(),
+                "accounts": Account.objects.count(),
+            }
+            indexes = Transaction._meta.indexes
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.remove_index(Transaction, index)
+            report["without_indexes"] = self.measure(connection, shapes, options)
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.add_index(Transaction, index)
+            report["with_indexes"] = self.measure(connection, shapes, options)
+
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+
+    def measure(self, connection, shapes, options):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        results = {}
+        for name, queryset in shapes.items():
+            if name == "account_type_total":
+                run = lambda qs=queryset: qs.aggregate(total=Sum("amount"))
+            else:
+                run = lambda qs=queryset: list(qs.all())
+            results[name] = {
+                "plan": queryset.explain().splitlines(),
+                **timed(run, options["repeat"]),
+            }
+        return results
@@ -0,0 +1,91 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from home import inventory
+from home.bench import bench_database, percentiles
+from home.db import retry_on_busy
+from home.models import Product
+
+INITIAL_STOCK = 10**9
+
+
+def naive_sale(user, product_id, quantity):
+    # خواندن و نوشتن دوباره در پایتون بدون transaction؛ فقط برای مقایسه
+    product = Product.objects.get(pk=product_id)
+    product.stock -= quantity
+    product.save(update_fields=["stock"])
+
+
+class Command(BaseCommand):
+    help = (
+        "فروشندگان همزمان روی یک کالا: تعداد فاکتور در ثانیه و تغییرهای گم‌شده "
+        "موجودی برای روش naive (خواندن و نوشتن)، F (home.inventory) و lock "
+        "(select_for_update و bulk_update)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sellers", type=int, nargs="+", default=[1, 4, 8])
+        parser.add_argument("--sales", type=int, default=200, help="به ازای هر فروشنده")
+        parser.add_argument("--lines", type=int, default=3, help="اقلام هر فاکتور")
+        parser.add_argument(
+            "--mode", choices=["naive", "f", "lock"], action="append", dest="modes"
+        )
+        parser.add_argument(
+            "--db",
+            default=str(settings.BASE_DIR / "bench_inventory.sqlite3"),
+            help="فایل دیتابیس بنچمارک (دیتابیس اصلی دست نمی‌خورد)",
+        )
+
+    def handle(self, *args, **options):
+        report = {}
+        for mode in options["modes"] or ["naive", "f", "lock"]:
+            report[mode] = {
+                sellers: self.run(options, mode, sellers) for sellers in options["sellers"]
+            }
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, options, mode, sellers):
+        with bench_database(options["db"]):
+            user = get_user_model().objects.create_user("bench-seller")
+            products = Product.objects.bulk_create(
+                Product(user=user, name=f"کالا {i}", price=1000, purchaseprice=800)
+                for i in range(options["lines"])
+            )
+            for product in products:
+                inventory.move(user, product.pk, INITIAL_STOCK, kind="IN")
+            lines = [(product.pk, 1, 1000) for product in products]
+            post = retry_on_busy(inventory.post_invoice)
+            latencies = []
+
+            def seller(index):
+                try:
+                    for _ in range(options["sales"]):
+                        start = time.perf_counter()
+                        if mode == "naive":
+                            for product_id, quantity, _ in lines:
+                                naive_sale(user, product_id, quantity)
+                        else:
+                            post(user, inventory.SALE, lines, lock=mode == "lock")
+                        latencies.append((time.perf_counter() - start) * 1000)
+                finally:
+                    connections.close_all()
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(sellers) as pool:
+                list(pool.map(seller, range(sellers)))
+            wall = time.perf_counter() - start
+
+            sold = sellers * options["sales"]
+            stock = Product.objects.filter(pk=products[0].pk).values_list("stock", flat=True)
+            return {
+                "invoices": sold,
+                "invoices_per_s": round(sold / wall, 1),
+                "lost_updates": stock.get() - (INITIAL_STOCK - sold),
+                **percentiles(latencies),
+            }
@@ -0,0 +1,67 @@
+import json
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from khayyam import JalaliDate
+
+from home import jalali
+
+
+def old_format(value):
+    # مسیر قبلی فیلتر jalali
+    return JalaliDate(value).strftime("%Y/%m/%d")
+
+
+def old_parse(value):
+    # مسیر قبلی validate_custom_date_format + clean_date
+    year, month, day = map(int, value.split("/"))
+    JalaliDate(year, month, day)
+    return JalaliDate(year, month, day).todate()
+
+
+class Command(BaseCommand):
+    help = "مقایسه هزینه هر ردیف تبدیل تاریخ شمسی: مسیر قبلی khayyam در برابر home.jalali"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=60,
+            help="تعداد روزهای متمایز (تکرار تاریخ در یک دفتر)",
+        )
+
+    def handle(self, *args, **options):
+        rnd = random.Random(0)
+        start = date.today() - timedelta(days=options["days"])
+        dates = [
+            start + timedelta(days=rnd.randrange(options["days"]))
+            for _ in range(options["rows"])
+        ]
+        strings = [old_format(value) for value in dates]
+        jalali.parse.cache_clear()
+        jalali._format.cache_clear()
+        jalali.to_gregorian.cache_clear()
+
+        assert [jalali.format_date(v) for v in dates[:100]] == strings[:100]
+        assert [jalali.parse(v) for v in strings[:100]] == dates[:100]
+
+        report = {"rows": options["rows"], "distinct_days": len(set(dates))}
+        for name, func, values in [
+            ("format_old", old_format, dates),
+            ("format_cached", jalali.format_date, dates),
+            ("parse_old", old_parse, strings),
+            ("parse_cached", jalali.parse, strings),
+        ]:
+            begin = time.perf_counter()
+            for value in values:
+                func(value)
+            elapsed = time.perf_counter() - begin
+            report[name] = {
+                "total_ms": round(elapsed * 1000, 2),
+                "per_row_us": round(elapsed / len(values) * 1e6, 3),
+            }
+        report["cache"] = jalali.cache_info()
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,323 @@
+import asyncio
+import json
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from home import urls
+from home.bench import bench_database, percentiles, seed
+from home.models import Account, Transaction
+
+# صفحاتی که فقط برای کاربر مهمان معنا دارند
+ANONYMOUS = {"signup", "login"}
+# صفحاتی که نشست را تمام می‌کنند؛ با Client جدا و login دوباره قبل از هر درخواست
+ENDS_SESSION = {"logout"}
+# حالت‌های اضافه روی URLهای موجود
+VARIANTS = {
+    "transactions_search": ("transactions", "?q=خرید"),
+    "accounts_search": ("accounts", "?q=حساب"),
+    "reports_quarter": ("reports", "?period=quarter"),
+}
+
+
+def targets(account, transaction):
+    """یک URL برای هر الگوی home/urls.py (به‌علاوه VARIANTS) با داده بنچمارک."""
+    kwargs = {
+        "deleteaccount": {"pk": account.pk},
+        "editaccount": {"pk": account.pk},
+        "account": {"pk": account.pk},
+        "accounttransactions": {"account_pk": account.pk},
+        "accounttransactions_export": {"account_pk": account.pk},
+        "bulk_transactions": {"account_pk": account.pk},
+        "transaction_register": {"account_pk": account.pk, "transaction_type": "ex"},
+        "deletetransaction": {"account_pk": account.pk, "pk": transaction.pk},
+        "updatetransaction": {"account_pk": account.pk, "pk": transaction.pk},
+        "api_account": {"pk": account.pk},
+        "api_transaction": {"pk": transaction.pk},
+    }
+    # الگوی جدید با پارامتر و بدون ورودی در kwargs اینجا NoReverseMatch می‌دهد
+    result = {
+        pattern.name: reverse(f"home:{pattern.name}", kwargs=kwargs.get(pattern.name))
+        for pattern in urls.urlpatterns
+    }
+    for name, (base, query) in VARIANTS.items():
+        result[name] = result[base] + query
+    return result
+
+
+class Worker:
+    """یک Client برای هر thread؛ اتصال دیتابیس جنگو هم مخصوص هر thread است."""
+
+    def __init__(self, user):
+        self.user = user
+        self.local = threading.local()
+
+    def client(self, name):
+        clients = getattr(self.local, "clients", None)
+        if clients is None:
+            # خطای view به صورت پاسخ ۵۰۰ شمرده می‌شود، نه استثنا
+            clients = self.local.clients = {
+                "anonymous": Client(raise_request_exception=False),
+                "member": Client(raise_request_exception=False),
+                "session": Client(raise_request_exception=False),
+            }
+            clients["member"].force_login(self.user)
+        if name in ANONYMOUS:
+            return clients["anonymous"]
+        if name in ENDS_SESSION:
+            clients["session"].force_login(self.user)
+            return clients["session"]
+        return clients["member"]
+
+    def request(self, name, url):
+        client = self.client(name)
+        with CaptureQueriesContext(connections["default"]) as ctx:
+            start = time.perf_counter()
+            response = client.get(url)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            elapsed = (time.perf_counter() - start) * 1000
+        return elapsed, len(ctx), response.status_code
+
+
+def peak_memory(worker, name, url):
+    # فقط یک درخواست زیر tracemalloc تا زمان‌ها تحت تاثیر قرار نگیرند
+    tracemalloc.start()
+    try:
+        worker.request(name, url)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_threads(worker, jobs, threads):
+    """هر job یک درخواست با test client (مسیر WSGI) در یکی از threads."""
+
+    def run(job):
+        name, url = job
+        elapsed, _, status = worker.request(name, url)
+        return name, elapsed, status
+
+    with ThreadPoolExecutor(threads) as pool:
+        return list(pool.map(run, jobs))
+
+
+def session_cookie(user):
+    client = Client()
+    client.force_login(user)
+    return "; ".join(f"{key}={morsel.value}" for key, morsel in client.cookies.items())
+
+
+async def asgi_get(application, url, cookie):
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    received = False
+    status = None
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # تا پایان پاسخ قطع اتصالی نیست؛ جنگو این انتظار را cancel می‌کند
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    start = time.perf_counter()
+    await application(scope, receive, send)
+    return (time.perf_counter() - start) * 1000, status
+
+
+def run_asgi(user, jobs, concurrency):
+    """
+    همان jobها روی ASGIHandler واقعی جنگو (get_asgi_application) با concurrency
+    درخواست همزمان در یک event loop، مثل یک worker uvicorn.
+    """
+    application = get_asgi_application()
+    member = session_cookie(user)
+
+    async def main():
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+        results = []
+
+        async def consume():
+            while not queue.empty():
+                name, url = queue.get_nowait()
+                if name in ANONYMOUS:
+                    cookie = ""
+                elif name in ENDS_SESSION:
+                    cookie = await sync_to_async(session_cookie)(user)
+                else:
+                    cookie = member
+                elapsed, status = await asgi_get(application, url, cookie)
+                results.append((name, elapsed, status))
+
+        await asyncio.gather(*(consume() for _ in range(concurrency)))
+        return results
+
+    return asyncio.run(main())
+
+
+def max_rss_kb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS بایت برمی‌گرداند، لینوکس کیلوبایت
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+class Command(BaseCommand):
+    help = (
+        "بنچمارک بار: داده نمونه users × accounts × transactions روی یک دیتابیس "
+        "جداگانه، اجرای همه URLهای home با Django test client به صورت ترتیبی و "
+        "با چند thread، و گزارش JSON صدک‌های زمان، تعداد کوئری و حافظه"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2)
+        parser.add_argument("--accounts", type=int, default=5)
+        parser.add_argument("--transactions", type=int, default=2000, help="به ازای هر حساب")
+        parser.add_argument("--days", type=int, default=720)
+        parser.add_argument("--requests", type=int, default=30, help="به ازای هر URL")
+        parser.add_argument("--threads", type=int, default=4, help="تعداد worker همزمان")
+        parser.add_argument(
+            "--asgi",
+            action="store_true",
+            help="مرحله همزمان روی ASGIHandler با --threads درخواست همزمان به جای thread",
+        )
+        parser.add_argument("--url", action="append", dest="names", help="فقط این URL (name)")
+        parser.add_argument(
+            "--db",
+            default=str(settings.BASE_DIR / "bench_load.sqlite3"),
+            help="فایل دیتابیس بنچمارک (دیتابیس اصلی دست نمی‌خورد)",
+        )
+        parser.add_argument(
+            "--reuse",
+            action="store_true",
+            help="استفاده از دیتابیس پر شده قبلی به جای ساخت دوباره",
+        )
+        parser.add_argument("--output", help="نوشتن JSON در این فایل به جای خروجی استاندارد")
+
+    def handle(self, *args, **options):
+        # بدون setup_test_environment تا رندر قالب‌ها instrument نشود و زمان‌ها واقعی بمانند
+        with override_settings(ALLOWED_HOSTS=["testserver"]), bench_database(
+            options["db"], fresh=not options["reuse"]
+        ):
+            if not Transaction.objects.exists():
+                seed(
+                    users=options["users"],
+                    accounts=options["accounts"],
+                    transactions=options["transactions"],
+                    days=options["days"],
+                )
+            account = Account.objects.select_related("user").order_by("pk").first()
+            transaction = account.transactions.order_by("-pk").first()
+            urls_by_name = targets(account, transaction)
+            if options["names"]:
+                urls_by_name = {name: urls_by_name[name] for name in options["names"]}
+            worker = Worker(account.user)
+
+            report = {
+                "config": {
+                    key: options[key]
+                    for key in ("users", "accounts", "transactions", "days", "requests", "threads")
+                },
+                "environment": {
+                    "python": sys.version.split()[0],
+                    "django": django.get_version(),
+                    "database": connection.vendor,
+                    "rows": Transaction.objects.count(),
+                    "handler": "asgi" if options["asgi"] else "wsgi",
+                },
+                "urls": {},
+            }
+
+            for name, url in urls_by_name.items():
+                worker.request(name, url)  # گرم کردن cacheها
+                samples, queries, statuses = [], set(), set()
+                for _ in range(options["requests"]):
+                    elapsed, count, status = worker.request(name, url)
+                    samples.append(elapsed)
+                    queries.add(count)
+                    statuses.add(status)
+                report["urls"][name] = {
+                    "url": url,
+                    "status": sorted(statuses),
+                    "sequential": percentiles(samples),
+                    "queries": max(queries),
+                    # تعداد کوئری متغیر معمولا یعنی cache یا N+1 وابسته به داده
+                    "queries_stable": len(queries) == 1,
+                    "peak_memory_kb": round(peak_memory(worker, name, url) / 1024, 1),
+                }
+
+            concurrent = defaultdict(list)
+            errors = defaultdict(int)
+            jobs = [
+                (name, url)
+                for _ in range(options["requests"])
+                for name, url in urls_by_name.items()
+            ]
+
+            start = time.perf_counter()
+            if options["asgi"]:
+                results = run_asgi(account.user, jobs, options["threads"])
+            else:
+                results = run_threads(worker, jobs, options["threads"])
+            wall = time.perf_counter() - start
+            for name, elapsed, status in results:
+                concurrent[name].append(elapsed)
+                errors[name] += status >= 500
+
+            for name, samples in concurrent.items():
+                report["urls"][name]["concurrent"] = {
+                    **percentiles(samples),
+                    "errors": errors[name],
+                }
+            report["concurrent"] = {
+                **percentiles([s for samples in concurrent.values() for s in samples]),
+                "requests": len(jobs),
+                "errors": sum(errors.values()),
+                "wall_s": round(wall, 3),
+                "throughput_rps": round(len(jobs) / wall, 1),
+            }
+            report["max_rss_kb"] = max_rss_kb()
+
+        output = json.dumps(report, indent=2, ensure_ascii=False, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fp:
+                fp.write(output + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write(output)
@@ -0,0 +1,90 @@
+import json
+import random
+from datetime import timedelta
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.humanize.templatetags.humanize import intcomma
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from home.bench import DESCRIPTIONS, timed
+from home.ledger import LedgerPage
+from home.models import Account, Transaction
+from home.templatetags.fa_numbers import fa_jalali, fa_money
+from home.templatetags.jalali_filters import jalali
+
+
+def legacy_fa_digits(value):
+    # پیاده‌سازی قبلی fa_digits
+    fa_numbers = {
+        '0': '۰', '1': '۱', '2': '۲', '3': '۳', '4': '۴',
+        '5': '۵', '6': '۶', '7': '۷', '8': '۸', '9': '۹'
+    }
+    return ''.join(fa_numbers.get(ch, ch) for ch in str(value))
+
+
+class Command(BaseCommand):
+    help = (
+        "زمان رندر accoount_transactions.html با داده ساختگی و مقایسه هزینه "
+        "فیلترهای عددی/تاریخ قبلی و جدید برای هر ردیف"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[20, 50, 100])
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        rnd = random.Random(0)
+        account = Account(id=1, full_name="حساب نمونه")
+        path = reverse("home:accounttransactions", args=[account.id])
+        request = RequestFactory().get(path)
+        request.user = AnonymousUser()
+        now = timezone.now()
+
+        report = {}
+        for size in options["rows"]:
+            rows, balance = [], 0
+            for pk in range(1, size + 1):
+                txn = Transaction(
+                    id=pk,
+                    account=account,
+                    type=rnd.choice(("RE", "EX")),
+                    amount=rnd.randrange(10_000, 50_000_000, 1000),
+                    description=rnd.choice(DESCRIPTIONS),
+                    date=now - timedelta(days=size - pk),
+                )
+                balance += txn.amount if txn.type == "RE" else -txn.amount
+                txn.balance = balance
+                rows.append(txn)
+            context = {
+                "transactions": LedgerPage(rows, True, True),
+                "account": account,
+                "summary": balance,
+                "total_income": 0,
+                "total_expense": 0,
+            }
+
+            def render():
+                render_to_string("home/accoount_transactions.html", context, request)
+
+            def legacy_filters():
+                for txn in rows:
+                    legacy_fa_digits(intcomma(txn.amount))
+                    legacy_fa_digits(jalali(txn.date))
+                    legacy_fa_digits(intcomma(txn.balance))
+
+            def new_filters():
+                for txn in rows:
+                    fa_money(txn.amount)
+                    fa_jalali(txn.date)
+                    fa_money(txn.balance)
+
+            report[size] = {
+                "render": timed(render, options["repeat"]),
+                "legacy_filters": timed(legacy_filters, options["repeat"]),
+                "filters": timed(new_filters, options["repeat"]),
+            }
+        self.stdout.write(json.dumps(report, indent=2))
@@ -0,0 +1,136 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connections
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from home import balances
+from home.bench import DESCRIPTIONS, bench_database, percentiles, seed
+from home.db import is_busy, retry_on_busy
+from home.ledger import ledger_page
+from home.models import Account, Transaction
+
+# تنظیمات پیش‌فرض جنگو (قبل از پروفایل production) در برابر settings.DATABASES
+PROFILES = {
+    "default": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False, "OPTIONS": {}},
+    "tuned": {
+        key: settings.DATABASES["default"][key]
+        for key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS", "OPTIONS")
+    },
+}
+
+
+def register(account_id, n):
+    # همان نوشتن‌های RegisterTransactionsView.post
+    with atomic():
+        transaction = Transaction.objects.create(
+            account_id=account_id,
+            type="EX" if n % 2 else "RE",
+            amount=1000 + n,
+            description=DESCRIPTIONS[n % len(DESCRIPTIONS)],
+            date=timezone.now(),
+        )
+        balances.record(transaction)
+
+
+class Command(BaseCommand):
+    help = (
+        "توان نوشتن SQLite با N نویسنده (و خواننده) همزمان: تنظیمات پیش‌فرض جنگو "
+        "در برابر پروفایل production در settings.DATABASES (WAL، pragmaها، "
+        "BEGIN IMMEDIATE، اتصال پایدار و retry_on_busy)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, nargs="+", default=[1, 4, 8])
+        parser.add_argument("--readers", type=int, default=2)
+        parser.add_argument("--writes", type=int, default=200, help="به ازای هر نویسنده")
+        parser.add_argument("--profile", choices=PROFILES, action="append", dest="profiles")
+        parser.add_argument(
+            "--db",
+            default=str(settings.BASE_DIR / "bench_writers.sqlite3"),
+            help="فایل دیتابیس بنچمارک (دیتابیس اصلی دست نمی‌خورد)",
+        )
+
+    def handle(self, *args, **options):
+        report = {}
+        settings_dict = connections["default"].settings_dict
+        original = {key: settings_dict.get(key) for key in PROFILES["default"]}
+        try:
+            for profile in options["profiles"] or list(PROFILES):
+                # settings_dict بین threadها مشترک است؛ اتصال‌های جدید همین را می‌خوانند
+                settings_dict.update(PROFILES[profile])
+                report[profile] = {
+                    writers: self.run(options, writers, retry=profile == "tuned")
+                    for writers in options["writers"]
+                }
+        finally:
+            settings_dict.update(original)
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, options, writers, retry):
+        # هر اجرا دیتابیس تازه دارد چون journal_mode=WAL در خود فایل می‌ماند
+        with bench_database(options["db"]) as connection:
+            seed(accounts=max(writers, 1), transactions=100)
+            account_ids = list(Account.objects.values_list("pk", flat=True))
+            journal_mode = connection.cursor().execute("PRAGMA journal_mode").fetchone()[0]
+            connection.close()
+
+            write = retry_on_busy(register) if retry else register
+            stop = threading.Event()
+            latencies, errors, read_errors, reads = [], [], [], [0]
+
+            def writer(index):
+                account_id = account_ids[index % len(account_ids)]
+                for n in range(options["writes"]):
+                    start = time.perf_counter()
+                    try:
+                        write(account_id, n)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                    except OperationalError as e:
+                        if not is_busy(e):
+                            raise
+                        errors.append(str(e))
+                    finally:
+                        # پایان «درخواست»: با CONN_MAX_AGE=0 اتصال بسته می‌شود
+                        close_old_connections()
+                connections.close_all()
+
+            def reader(index):
+                account_id = account_ids[index % len(account_ids)]
+                while not stop.is_set():
+                    try:
+                        list(ledger_page(Transaction.objects.filter(account_id=account_id)))
+                        balances.account_totals(account_id)
+                        reads[0] += 1
+                    except OperationalError as e:
+                        if not is_busy(e):
+                            raise
+                        read_errors.append(str(e))
+                    finally:
+                        close_old_connections()
+                connections.close_all()
+
+            with ThreadPoolExecutor(writers + options["readers"]) as pool:
+                readers = [pool.submit(reader, i) for i in range(options["readers"])]
+                start = time.perf_counter()
+                for future in [pool.submit(writer, i) for i in range(writers)]:
+                    future.result()
+                wall = time.perf_counter() - start
+                stop.set()
+                for future in readers:
+                    future.result()
+
+        return {
+            "journal_mode": journal_mode,
+            "writes": len(latencies),
+            "failed_writes": len(errors),
+            "writes_per_s": round(len(latencies) / wall, 1),
+            "reads_per_s": round(reads[0] / wall, 1),
+            "failed_reads": len(read_errors),
+            **percentiles(latencies),
+        }
@@ -0,0 +1,60 @@
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from home.importer import BATCH_SIZE, import_transactions
+from home.models import Account
+
+
+class Command(BaseCommand):
+    help = "ورود گروهی تراکنش‌ها از فایل CSV یا JSON (از جمله خروجی dumpdata)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--user", required=True, help="نام کاربری صاحب تراکنش‌ها")
+        parser.add_argument(
+            "--account", type=int, help="ثبت همه ردیف‌ها در این حساب (شماره حساب)"
+        )
+        parser.add_argument("--format", choices=["csv", "json"])
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        fmt = options["format"] or path.suffix.lstrip(".").lower()
+        if fmt == "jsonl":
+            fmt = "json"
+        try:
+            user = get_user_model().objects.get(username=options["user"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist.")
+        account = None
+        if options["account"]:
+            try:
+                account = Account.objects.get(user=user, pk=options["account"])
+            except Account.DoesNotExist:
+                raise CommandError(f"Account {options['account']} does not exist.")
+
+        start = time.perf_counter()
+        try:
+            with path.open("rb") as fp:
+                result = import_transactions(
+                    fp, fmt, user, account, batch_size=options["batch_size"]
+                )
+        except (OSError, ValidationError) as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - start
+
+        for line, message in result.errors:
+            self.stderr.write(f"row {line}: {message}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f"... {result.error_count - len(result.errors)} more errors")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.created} of {result.rows} rows "
+                f"({result.accounts_created} accounts created, "
+                f"{result.error_count} rejected) in {elapsed:.2f}s."
+            )
+        )
@@ -0,0 +1,93 @@
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+# همان کارهایی که یک worker قبل از اولین درخواست انجام می‌دهد: setup، middlewareها،
+# urlconf (viewها، فرم‌ها) و کتابخانه‌های template tag
+STARTUP = (
+    "from django.core.wsgi import get_wsgi_application;"
+    "get_wsgi_application();"
+    "from django.urls import get_resolver;"
+    "get_resolver().url_patterns;"
+    "from django.template import engines;"
+    "[engine.engine.template_libraries for engine in engines.all()]"
+)
+
+
+def parse_importtime(stderr):
+    """خروجی python -X importtime: لیست (نام ماژول، self میکروثانیه، cumulative، عمق)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(own), int(cumulative), depth))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "هزینه import هر ماژول هنگام بالا آمدن یک worker (python -X importtime در "
+        "یک پروسه جدا): زمان کل، گران‌ترین ماژول‌ها و جمع به تفکیک پکیج"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument(
+            "--sort", choices=["cumulative", "self"], default="cumulative"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="کمترین زمان هر ماژول بین اجراها"
+        )
+        parser.add_argument("--prefix", help="فقط ماژول‌هایی که با این نام شروع می‌شوند")
+
+    def handle(self, *args, **options):
+        runs = [self.run_once() for _ in range(max(1, options["repeat"]))]
+
+        own, cumulative, totals = defaultdict(list), defaultdict(list), []
+        for rows in runs:
+            totals.append(sum(row[2] for row in rows if row[3] == 0))
+            for name, self_us, cumulative_us, _ in rows:
+                own[name].append(self_us)
+                cumulative[name].append(cumulative_us)
+        own = {name: min(values) for name, values in own.items()}
+        cumulative = {name: min(values) for name, values in cumulative.items()}
+
+        self.stdout.write(
+            f"startup imports: {statistics.median(totals) / 1000:.1f}ms "
+            f"(median of {len(runs)}), {len(own)} modules"
+        )
+
+        names = [
+            name for name in own if not options["prefix"] or name.startswith(options["prefix"])
+        ]
+        key = cumulative if options["sort"] == "cumulative" else own
+        names.sort(key=key.get, reverse=True)
+        self.stdout.write(f"\n{'self ms':>9} {'cumul ms':>9}  module")
+        for name in names[: options["top"]]:
+            self.stdout.write(f"{own[name] / 1000:9.1f} {cumulative[name] / 1000:9.1f}  {name}")
+
+        packages = defaultdict(int)
+        for name, value in own.items():
+            packages[name.split(".")[0]] += value
+        self.stdout.write(f"\n{'self ms':>9}  package")
+        for package, value in sorted(packages.items(), key=lambda item: -item[1])[
+            : options["top"]
+        ]:
+            self.stdout.write(f"{value / 1000:9.1f}  {package}")
+
+    def run_once(self):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", STARTUP],
+            env={**os.environ, "PYTHONDONTWRITEBYTECODE": ""},
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        return parse_importtime(result.stderr)
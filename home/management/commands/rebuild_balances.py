@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from home import balances
+
+
+class Command(BaseCommand):
+    help = "بازسازی یا بررسی جمع‌های ذخیره‌شده حساب‌ها (AccountBalance / AccountDailyBalance)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--account",
+            type=int,
+            action="append",
+            dest="accounts",
+            help="فقط این حساب (قابل تکرار)",
+        )
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="فقط بررسی؛ در صورت اختلاف با کد خطا خارج می‌شود",
+        )
+
+    def handle(self, *args, **options):
+        accounts = options["accounts"]
+        if options["verify"]:
+            mismatches = balances.verify(accounts)
+            for (account_id, day), expected, actual in sorted(
+                mismatches, key=lambda m: (m[0][0], str(m[0][1]))
+            ):
+                self.stdout.write(
+                    f"account={account_id} day={day or 'total'} "
+                    f"expected={expected} stored={actual}"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} mismatched balance rows.")
+            self.stdout.write(self.style.SUCCESS("Balances are consistent."))
+            return
+
+        account_count, day_count = balances.rebuild(accounts)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt balances for {account_count} accounts ({day_count} daily rows)."
+            )
+        )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from home import reports
+
+
+class Command(BaseCommand):
+    help = "بازسازی یا بررسی جمع‌های روزانه دسته‌بندی‌ها (CategoryDailyBalance) برای گزارش‌ها"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--account",
+            type=int,
+            action="append",
+            dest="accounts",
+            help="فقط این حساب (قابل تکرار)",
+        )
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="فقط بررسی؛ در صورت اختلاف با کد خطا خارج می‌شود",
+        )
+
+    def handle(self, *args, **options):
+        accounts = options["accounts"]
+        if options["verify"]:
+            mismatches = reports.verify(accounts)
+            for (account_id, day, category), expected, actual in sorted(
+                mismatches, key=lambda m: (m[0][0], m[0][1], m[0][2])
+            ):
+                self.stdout.write(
+                    f"account={account_id} day={day} category={category!r} "
+                    f"expected={expected} stored={actual}"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} mismatched report rows.")
+            self.stdout.write(self.style.SUCCESS("Report rollups are consistent."))
+            return
+
+        account_count, row_count = reports.rebuild(accounts)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt report rollups for {account_count} accounts ({row_count} rows)."
+            )
+        )
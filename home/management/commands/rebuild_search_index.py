@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from home import search
+
+
+class Command(BaseCommand):
+    help = "بازسازی ایندکس‌های FTS5 جستجوی حساب‌ها و تراکنش‌ها"
+
+    def handle(self, *args, **options):
+        if not search.available():
+            self.stdout.write(self.style.WARNING("Full-text search needs SQLite; skipped."))
+            return
+        accounts, transactions = search.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {accounts} accounts and {transactions} transactions."
+            )
+        )
@@ -0,0 +1,57 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# لاتین پایه و Latin-1، علائم نگارشی عمومی (ZWNJ، نشانه‌های جهت)، عربی و فارسی
+# (با ارقام فارسی) و شکل‌های نمایشی عربی
+UNICODES = (
+    "U+0020-007E,U+00A0-00FF,U+2000-206F,U+20AC,U+FEFF,"
+    "U+0600-06FF,U+0750-077F,U+FB50-FDFF,U+FE70-FEFE"
+)
+SOURCES = ["fonts/byekan2.TTF", "fonts/iraniansans.ttf", "fonts/yekan.ttf"]
+
+
+class Command(BaseCommand):
+    help = (
+        "ساخت نسخه WOFF2 فونت‌ها فقط با حروف فارسی/عربی و لاتین در کنار TTFها؛ "
+        "به fonttools و brotli نیاز دارد و فقط هنگام تغییر فونت‌ها اجرا می‌شود"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "fonts", nargs="*", default=SOURCES, help="مسیر نسبت به پوشه static"
+        )
+        parser.add_argument("--unicodes", default=UNICODES)
+
+    def handle(self, *args, **options):
+        try:
+            from fontTools import subset
+        except ImportError:
+            raise CommandError("pip install fonttools brotli")
+
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        unicodes = subset.parse_unicodes(options["unicodes"])
+        for name in options["fonts"]:
+            source = static_dir / name
+            if not source.exists():
+                raise CommandError(f"{source} پیدا نشد.")
+            target = source.with_suffix(".woff2")
+
+            subset_options = subset.Options()
+            subset_options.flavor = "woff2"
+            # شکل‌های آغازی/میانی/پایانی و اتصال حروف فارسی به GSUB نیاز دارند
+            subset_options.layout_features = ["*"]
+            subset_options.name_IDs = ["*"]
+            subset_options.hinting = False
+            subset_options.desubroutinize = True
+            font = subset.load_font(str(source), subset_options)
+            subsetter = subset.Subsetter(subset_options)
+            subsetter.populate(unicodes=unicodes)
+            subsetter.subset(font)
+            subset.save_font(font, str(target), subset_options)
+
+            before, after = source.stat().st_size, target.stat().st_size
+            self.stdout.write(
+                f"{name} -> {target.name}: {before / 1024:.1f}KB -> {after / 1024:.1f}KB"
+            )
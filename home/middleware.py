@@ -0,0 +1,155 @@
+"""
+پروفایل سبک درخواست‌ها، فعال با settings.PROFILING["ENABLED"].
+
+برای هر درخواست زمان کل، تعداد و زمان کوئری‌ها و کوئری‌های تکراری (شکل N+1)
+ثبت می‌شود: در لاگ home.profiling و هدر Server-Timing. کوئری‌ها با
+connection.execute_wrapper شمرده می‌شوند و به DEBUG نیازی نیست.
+
+درخواست‌های کندتر از SLOW_MS در صورت تنظیم PROFILER روی دیسک ذخیره می‌شوند:
+  "cprofile" : خروجی .prof برای pstats / snakeviz (همه درخواست‌ها پروفایل می‌شوند)
+  "sample"   : نمونه‌برداری از stack هر SAMPLE_INTERVAL_MS با سربار کم، خروجی
+               collapsed stack (.folded) برای flamegraph
+"""
+
+import cProfile
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("home.profiling")
+
+DEFAULTS = {
+    "ENABLED": False,
+    "SLOW_MS": 500,
+    "PROFILER": None,
+    "PROFILE_DIR": Path(settings.BASE_DIR) / "profiles",
+    "SAMPLE_INTERVAL_MS": 5,
+    "DUPLICATE_THRESHOLD": 3,
+}
+
+
+class QueryRecorder:
+    """execute_wrapper: تعداد، زمان و شکل (SQL بدون پارامتر) کوئری‌ها."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.shapes[sql] += 1
+
+    def duplicates(self, threshold):
+        return [(sql, n) for sql, n in self.shapes.most_common() if n >= threshold]
+
+
+class StackSampler(threading.Thread):
+    """نمونه‌برداری دوره‌ای از stack یک thread (همان thread درخواست)."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as fp:
+            for stack, count in self.samples.most_common():
+                fp.write(f"{stack} {count}\n")
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.options = {**DEFAULTS, **getattr(settings, "PROFILING", {})}
+        if not self.options["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.profile_dir = Path(self.options["PROFILE_DIR"])
+        if self.options["PROFILER"]:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        profiler = sampler = None
+        if self.options["PROFILER"] == "cprofile":
+            profiler = cProfile.Profile()
+        elif self.options["PROFILER"] == "sample":
+            sampler = StackSampler(
+                threading.get_ident(), self.options["SAMPLE_INTERVAL_MS"] / 1000
+            )
+            sampler.start()
+
+        start = time.perf_counter()
+        with connections["default"].execute_wrapper(recorder):
+            if profiler:
+                response = profiler.runcall(self.get_response, request)
+            else:
+                response = self.get_response(request)
+        elapsed = (time.perf_counter() - start) * 1000
+        if sampler:
+            sampler.stop()
+
+        sql_ms = recorder.duration * 1000
+        response["Server-Timing"] = (
+            f'app;dur={elapsed:.1f}, sql;dur={sql_ms:.1f};desc="{recorder.count} queries"'
+        )
+
+        match = request.resolver_match
+        view = match.view_name if match else "-"
+        logger.info(
+            "%s %s view=%s status=%s %.1fms sql=%d (%.1fms)",
+            request.method,
+            request.path,
+            view,
+            response.status_code,
+            elapsed,
+            recorder.count,
+            sql_ms,
+        )
+        for sql, count in recorder.duplicates(self.options["DUPLICATE_THRESHOLD"]):
+            logger.warning("%s: query repeated %d times: %s", view, count, sql)
+
+        if elapsed >= self.options["SLOW_MS"] and (profiler or sampler):
+            name = "{}-{}-{:.0f}ms".format(
+                time.strftime("%Y%m%d-%H%M%S"),
+                re.sub(r"[^\w.-]+", "_", view),
+                elapsed,
+            )
+            if profiler:
+                path = self.profile_dir / f"{name}.prof"
+                profiler.dump_stats(path)
+            else:
+                path = self.profile_dir / f"{name}.folded"
+                sampler.dump(path)
+            logger.warning("slow request %s %s saved to %s", request.method, request.path, path)
+        return response
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def populate_balances(apps, schema_editor):
+    Account = apps.get_model("home", "Account")
+    Transaction = apps.get_model("home", "Transaction")
+    AccountBalance = apps.get_model("home", "AccountBalance")
+    AccountDailyBalance = apps.get_model("home", "AccountDailyBalance")
+
+    totals = {pk: [0, 0, 0] for pk in Account.objects.values_list("pk", flat=True)}
+    daily = []
+    rows = (
+        Transaction.objects.annotate(day=TruncDate("date"))
+        .values("account_id", "day")
+        .annotate(
+            income=Sum("amount", filter=Q(type="RE")),
+            expense=Sum("amount", filter=Q(type="EX")),
+            count=Count("id"),
+        )
+        .order_by()
+    )
+    for row in rows:
+        income, expense = row["income"] or 0, row["expense"] or 0
+        daily.append(
+            AccountDailyBalance(
+                account_id=row["account_id"],
+                day=row["day"],
+                total_income=income,
+                total_expense=expense,
+                transaction_count=row["count"],
+            )
+        )
+        bucket = totals[row["account_id"]]
+        bucket[0] += income
+        bucket[1] += expense
+        bucket[2] += row["count"]
+
+    AccountDailyBalance.objects.bulk_create(daily, batch_size=1000)
+    AccountBalance.objects.bulk_create(
+        [
+            AccountBalance(
+                account_id=pk,
+                total_income=income,
+                total_expense=expense,
+                transaction_count=count,
+            )
+            for pk, (income, expense, count) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0004_alter_transaction_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_income', models.DecimalField(decimal_places=0, default=0, max_digits=18)),
+                ('total_expense', models.DecimalField(decimal_places=0, default=0, max_digits=18)),
+                ('transaction_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='balance', to='home.account')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=256)),
+                ('unit', models.IntegerField(default=0, max_length=20)),
+                ('price', models.DecimalField(decimal_places=0, max_digits=15)),
+                ('purchaseprice', models.DecimalField(decimal_places=0, max_digits=15)),
+                ('stock', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='user', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AccountDailyBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('total_income', models.DecimalField(decimal_places=0, default=0, max_digits=18)),
+                ('total_expense', models.DecimalField(decimal_places=0, default=0, max_digits=18)),
+                ('transaction_count', models.IntegerField(default=0)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_balances', to='home.account')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('account', 'day'), name='unique_account_daily_balance')],
+            },
+        ),
+        migrations.RunPython(populate_balances, migrations.RunPython.noop),
+    ]
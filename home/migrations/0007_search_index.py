@@ -0,0 +1,92 @@
+from django.db import migrations
+
+
+ACCOUNT_TABLE = "home_account_search"
+TRANSACTION_TABLE = "home_transaction_search"
+
+# کپی home.search.normalize در زمان این migration؛ تغییرهای بعدی آن نباید
+# نتیجه migration قدیمی را عوض کند (rebuild_search_index با نسخه فعلی می‌سازد)
+_TRANSLATION = str.maketrans(
+    {
+        "ي": "ی",
+        "ى": "ی",
+        "ك": "ک",
+        "\u200c": " ",  # نیم‌فاصله
+        "ـ": None,  # کشیده
+        **{chr(code): None for code in range(0x064B, 0x0653)},  # اعراب
+        **{chr(0x06F0 + d): str(d) for d in range(10)},  # ارقام فارسی
+        **{chr(0x0660 + d): str(d) for d in range(10)},  # ارقام عربی
+    }
+)
+
+
+def normalize(text):
+    if not text:
+        return ""
+    return " ".join(str(text).translate(_TRANSLATION).casefold().split())
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    Account = apps.get_model("home", "Account")
+    Transaction = apps.get_model("home", "Transaction")
+    owners = dict(Account.objects.values_list("pk", "user_id"))
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"""CREATE VIRTUAL TABLE {ACCOUNT_TABLE} USING fts5(
+                full_name, address, email, phone_number,
+                user_id UNINDEXED, tokenize='trigram'
+            )"""
+        )
+        cursor.execute(
+            f"""CREATE VIRTUAL TABLE {TRANSACTION_TABLE} USING fts5(
+                description, user_id UNINDEXED, account_id UNINDEXED, tokenize='trigram'
+            )"""
+        )
+        cursor.executemany(
+            f"INSERT INTO {ACCOUNT_TABLE} "
+            "(rowid, full_name, address, email, phone_number, user_id) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [
+                [
+                    account.pk,
+                    normalize(account.full_name),
+                    normalize(account.address),
+                    normalize(account.email),
+                    normalize(account.phone_number),
+                    account.user_id,
+                ]
+                for account in Account.objects.all()
+            ],
+        )
+        cursor.executemany(
+            f"INSERT INTO {TRANSACTION_TABLE} "
+            "(rowid, description, user_id, account_id) VALUES (%s, %s, %s, %s)",
+            [
+                [pk, normalize(description), owners.get(account_id), account_id]
+                for pk, description, account_id in Transaction.objects.values_list(
+                    "pk", "description", "account_id"
+                ).iterator()
+            ],
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {ACCOUNT_TABLE}")
+        cursor.execute(f"DROP TABLE IF EXISTS {TRANSACTION_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0006_transaction_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
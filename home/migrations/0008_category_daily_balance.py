@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def populate_category_balances(apps, schema_editor):
+    Transaction = apps.get_model("home", "Transaction")
+    CategoryDailyBalance = apps.get_model("home", "CategoryDailyBalance")
+
+    rows = (
+        Transaction.objects.annotate(day=TruncDate("date"))
+        .values("account_id", "day", "category")
+        .annotate(
+            income=Sum("amount", filter=Q(type="RE")),
+            expense=Sum("amount", filter=Q(type="EX")),
+            count=Count("id"),
+        )
+        .order_by()
+    )
+    CategoryDailyBalance.objects.bulk_create(
+        [
+            CategoryDailyBalance(
+                account_id=row["account_id"],
+                day=row["day"],
+                category=row["category"] or "",
+                total_income=row["income"] or 0,
+                total_expense=row["expense"] or 0,
+                transaction_count=row["count"],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0007_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryDailyBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('category', models.CharField(max_length=100)),
+                ('total_income', models.DecimalField(decimal_places=0, default=0, max_digits=18)),
+                ('total_expense', models.DecimalField(decimal_places=0, default=0, max_digits=18)),
+                ('transaction_count', models.IntegerField(default=0)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_balances', to='home.account')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'account'], name='category_balance_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('account', 'day', 'category'), name='unique_category_daily_balance')],
+            },
+        ),
+        migrations.RunPython(populate_category_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def opening_movements(apps, schema_editor):
+    # موجودی‌های قبلی به صورت یک ردیف اصلاح تا stock برابر جمع ردیف‌ها بماند
+    Product = apps.get_model("home", "Product")
+    StockMovement = apps.get_model("home", "StockMovement")
+    StockMovement.objects.bulk_create(
+        [
+            StockMovement(product_id=pk, kind="ADJ", quantity=stock)
+            for pk, stock in Product.objects.filter(stock__gt=0).values_list("pk", "stock")
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0009_accountbalance_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='unit',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='Invoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('SA', 'فروش'), ('PU', 'خرید')], max_length=2)),
+                ('total', models.DecimalField(decimal_places=0, default=0, max_digits=18)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='invoices', to='home.account')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='invoices', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('IN', 'ورود'), ('OUT', 'خروج'), ('ADJ', 'اصلاح')], max_length=3)),
+                ('quantity', models.IntegerField()),
+                ('unit_price', models.DecimalField(decimal_places=0, default=0, max_digits=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('invoice', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='items', to='home.invoice')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='movements', to='home.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'created_at'], name='movement_product_idx')],
+            },
+        ),
+        migrations.RunPython(opening_movements, migrations.RunPython.noop),
+    ]
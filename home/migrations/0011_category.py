@@ -0,0 +1,159 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import TruncDate
+
+# کپی home.categories.clean_name در زمان این migration؛ تغییرهای بعدی آن نباید
+# نتیجه migration قدیمی را عوض کند
+_TRANSLATION = str.maketrans({"ي": "ی", "ى": "ی", "ك": "ک"})
+
+
+def clean_name(name):
+    return " ".join(str(name or "").translate(_TRANSLATION).split())[:100]
+
+
+def daily_rows(Transaction, category):
+    return (
+        Transaction.objects.annotate(day=TruncDate("date"))
+        .values("account_id", "day", category)
+        .annotate(
+            income=Sum("amount", filter=Q(type="RE")),
+            expense=Sum("amount", filter=Q(type="EX")),
+            count=Count("id"),
+        )
+        .order_by()
+    )
+
+
+def rebuild_daily(apps, category, default):
+    Transaction = apps.get_model("home", "Transaction")
+    CategoryDailyBalance = apps.get_model("home", "CategoryDailyBalance")
+    CategoryDailyBalance.objects.all().delete()
+    CategoryDailyBalance.objects.bulk_create(
+        [
+            CategoryDailyBalance(
+                account_id=row["account_id"],
+                day=row["day"],
+                category=row[category] or default,
+                total_income=row["income"] or 0,
+                total_expense=row["expense"] or 0,
+                transaction_count=row["count"],
+            )
+            for row in daily_rows(Transaction, category)
+        ],
+        batch_size=1000,
+    )
+
+
+def dedupe_categories(apps, schema_editor):
+    Account = apps.get_model("home", "Account")
+    Category = apps.get_model("home", "Category")
+    Transaction = apps.get_model("home", "Transaction")
+
+    owners = dict(Account.objects.values_list("pk", "user_id"))
+    pairs = list(
+        Transaction.objects.values_list("account_id", "category_name").distinct().order_by()
+    )
+    keys = {(owners[account_id], clean_name(raw)) for account_id, raw in pairs}
+    Category.objects.bulk_create(
+        [Category(user_id=user_id, name=name) for user_id, name in keys if name],
+        batch_size=1000,
+    )
+    ids = {
+        (user_id, name): pk
+        for pk, user_id, name in Category.objects.values_list("pk", "user_id", "name")
+    }
+    for account_id, raw in pairs:
+        pk = ids.get((owners[account_id], clean_name(raw)))
+        if pk is not None:
+            Transaction.objects.filter(account_id=account_id, category_name=raw).update(
+                category_id=pk
+            )
+    rebuild_daily(apps, "category_id", 0)
+
+
+def restore_category_names(apps, schema_editor):
+    # برگشت: category_name که RemoveField خالی برمی‌گرداند از نام Category پر می‌شود
+    Category = apps.get_model("home", "Category")
+    Transaction = apps.get_model("home", "Transaction")
+    Transaction.objects.filter(category__isnull=False).update(
+        category_name=Subquery(Category.objects.filter(pk=OuterRef("category_id")).values("name"))
+    )
+
+
+def clear_daily(apps, schema_editor):
+    # جمع‌های روزانه بعد از تغییر نوع category در dedupe_categories دوباره ساخته
+    # می‌شوند؛ ردیف‌های قبلی همه category=0 می‌گرفتند و قید یکتایی را می‌شکستند
+    apps.get_model("home", "CategoryDailyBalance").objects.all().delete()
+
+
+def restore_daily_names(apps, schema_editor):
+    # برگشت: جمع‌های روزانه دوباره با نام دسته، مثل 0008
+    rebuild_daily(apps, "category_name", "")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0010_inventory'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='categories', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'name'), name='unique_user_category')],
+            },
+        ),
+        migrations.RenameField(
+            model_name='transaction',
+            old_name='category',
+            new_name='category_name',
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='transactions', to='home.category'),
+        ),
+        migrations.RemoveConstraint(
+            model_name='categorydailybalance',
+            name='unique_category_daily_balance',
+        ),
+        migrations.RunPython(clear_daily, restore_daily_names),
+        # default فقط برای برگشت: ستون NOT NULL دوباره با مقدار خالی ساخته شود
+        migrations.AlterField(
+            model_name='categorydailybalance',
+            name='category',
+            field=models.CharField(default='', max_length=100),
+        ),
+        migrations.RemoveField(
+            model_name='categorydailybalance',
+            name='category',
+        ),
+        migrations.AddField(
+            model_name='categorydailybalance',
+            name='category',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='categorydailybalance',
+            constraint=models.UniqueConstraint(fields=('account', 'day', 'category'), name='unique_category_daily_balance'),
+        ),
+        migrations.RunPython(dedupe_categories, restore_category_names),
+        migrations.AlterField(
+            model_name='transaction',
+            name='category_name',
+            field=models.CharField(default='', max_length=100),
+        ),
+        migrations.RemoveField(
+            model_name='transaction',
+            name='category_name',
+        ),
+    ]
@@ -15,6 +15,20 @@ class Account(models.Model):
 
 
 
+class Category(models.Model):
+    # دسته‌بندی‌های هر کاربر؛ تراکنش‌ها و جمع‌ها با کلید عددی به آن اشاره می‌کنند
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="categories")
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "name"], name="unique_user_category"),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
 class Transaction(models.Model):
     TRANSACTION_TYPES = [
         ("RE", "دریافت"),
@@ -26,14 +40,27 @@ class Transaction(models.Model):
     )
     type = models.CharField(max_length=2, choices=TRANSACTION_TYPES)
     amount = models.DecimalField(max_digits=15, decimal_places=0)
-    category = models.CharField(max_length=100)  
+    category = models.ForeignKey(
+        "Category", on_delete=models.PROTECT, null=True, blank=True, related_name="transactions"
+    )
     description = models.TextField(blank=True, null=True)
     date = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # لیست تراکنش‌ها به ترتیب -created_at
+            models.Index(fields=["account", "created_at"], name="txn_account_created_idx"),
+            # دفتر حساب و cursorها به ترتیب (date, id)
+            models.Index(fields=["account", "date", "id"], name="txn_account_date_idx"),
+            # جمع دریافت/پرداخت هر حساب
+            models.Index(fields=["account", "type"], name="txn_account_type_idx"),
+        ]
+
     def __str__(self):
+        # فقط فیلدهای خود ردیف؛ چاپ تراکنش کوئری حساب و کاربر نمی‌زند
         sign = "+" if self.type == "RE" else "-"
-        return f"{self.account.user} | {self.account} | {sign}  {self.amount}"
+        return f"{self.account_id} | {sign}  {self.amount} | {self.date}"
     
     # @property
     # def balance(self):
@@ -45,25 +72,129 @@ class Transaction(models.Model):
     #     return received - paid
 
 
+class AccountBalance(models.Model):
+    # جمع‌های ذخیره‌شده هر حساب؛ با هر ثبت/ویرایش/حذف تراکنش به‌روز می‌شود
+    account = models.OneToOneField(
+        "Account", on_delete=models.CASCADE, related_name="balance"
+    )
+    total_income = models.DecimalField(max_digits=18, decimal_places=0, default=0)
+    total_expense = models.DecimalField(max_digits=18, decimal_places=0, default=0)
+    transaction_count = models.IntegerField(default=0)
+    # با هر تغییر تراکنش‌ها یا خود حساب یکی زیاد می‌شود؛ کلید cache صفحات (fragments)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def net(self):
+        return self.total_income - self.total_expense
+
+    def __str__(self):
+        return f"{self.account_id} | {self.net}"
+
+
+class AccountDailyBalance(models.Model):
+    # جمع‌های روزانه هر حساب (روز بر اساس تاریخ تراکنش)
+    account = models.ForeignKey(
+        "Account", on_delete=models.CASCADE, related_name="daily_balances"
+    )
+    day = models.DateField()
+    total_income = models.DecimalField(max_digits=18, decimal_places=0, default=0)
+    total_expense = models.DecimalField(max_digits=18, decimal_places=0, default=0)
+    transaction_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "day"], name="unique_account_daily_balance"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} | {self.day}"
+
+
+class CategoryDailyBalance(models.Model):
+    # جمع‌های روزانه هر حساب به تفکیک دسته‌بندی؛ پایه گزارش‌های دوره‌ای (home.reports)
+    account = models.ForeignKey(
+        "Account", on_delete=models.CASCADE, related_name="category_balances"
+    )
+    day = models.DateField()
+    # Category.pk؛ ۰ برای تراکنش‌های بدون دسته (کلید UPSERT نمی‌تواند NULL باشد)
+    category = models.PositiveIntegerField(default=0)
+    total_income = models.DecimalField(max_digits=18, decimal_places=0, default=0)
+    total_expense = models.DecimalField(max_digits=18, decimal_places=0, default=0)
+    transaction_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "day", "category"],
+                name="unique_category_daily_balance",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["day", "account"], name="category_balance_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.account_id} | {self.day} | {self.category}"
+
+
 class Product(models.Model):
     user = models.ForeignKey(get_user_model() , on_delete=models.DO_NOTHING, related_name="user")
     name = models.CharField(max_length=256)
-    unit = models.IntegerField(max_length=20, default=0)  # واحد اندازه‌گیری (عدد، کیلوگرم، متر و ...)
+    unit = models.IntegerField(default=0)  # واحد اندازه‌گیری (عدد، کیلوگرم، متر و ...)
     price = models.DecimalField(max_digits=15, decimal_places=0)  # قیمت واحد
     purchaseprice = models.DecimalField(max_digits=15, decimal_places=0)
+    # موجودی فعلی؛ فقط از home.inventory و با UPDATE اتمی (F) تغییر می‌کند و
+    # همیشه برابر جمع StockMovementهای کالاست
     stock = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.name} - ({self.sku})"
+        return self.name
 
-# class factor(models.Model):
-#     product = models.ForeignKey('Product', on_delete=models.CASCADE, related_name='inventories')
-#     quantity = models.DecimalField(max_digits=15, decimal_places=2, default=0)
-#     last_updated = models.DateTimeField(auto_now=True)
 
-#     class Meta:
-#         unique_together = ('product', 'warehouse')  # هر کالا در هر انبار فقط یک رکورد موجودی
+class Invoice(models.Model):
+    KINDS = [
+        ("SA", "فروش"),
+        ("PU", "خرید"),
+    ]
+
+    user = models.ForeignKey(get_user_model(), on_delete=models.DO_NOTHING, related_name="invoices")
+    account = models.ForeignKey(
+        "Account", on_delete=models.PROTECT, null=True, blank=True, related_name="invoices"
+    )
+    kind = models.CharField(max_length=2, choices=KINDS)
+    total = models.DecimalField(max_digits=18, decimal_places=0, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
 
-#     def __str__(self):
-#         return f"{self.product.name} - {self.quantity} در {self.warehouse.name}"
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.pk} | {self.total}"
+
+
+class StockMovement(models.Model):
+    # هر تغییر موجودی؛ ردیف‌های یک فاکتور همان اقلام فاکتور هستند
+    KINDS = [
+        ("IN", "ورود"),
+        ("OUT", "خروج"),
+        ("ADJ", "اصلاح"),
+    ]
+
+    product = models.ForeignKey("Product", on_delete=models.PROTECT, related_name="movements")
+    invoice = models.ForeignKey(
+        "Invoice", on_delete=models.PROTECT, null=True, blank=True, related_name="items"
+    )
+    kind = models.CharField(max_length=3, choices=KINDS)
+    # علامت‌دار: ورود مثبت، خروج منفی
+    quantity = models.IntegerField()
+    unit_price = models.DecimalField(max_digits=15, decimal_places=0, default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "created_at"], name="movement_product_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} | {self.quantity:+}"
@@ -0,0 +1,81 @@
+"""
+Paginatorهایی که برای هر صفحه COUNT(*) روی کل queryset نمی‌زنند.
+
+CounterPaginator: تعداد از جمع‌های نگه‌داری‌شده (AccountBalance) داده می‌شود؛
+  برای لیست‌های بدون فیلتر.
+CappedPaginator: برای لیست‌های فیلترشده (مثلا icontains) فقط تا cap ردیف
+  شمرده می‌شود. اگر نتایج بیشتر باشد تعداد کل نامعلوم است (exact=False) و
+  صفحه بعد با خواندن یک ردیف اضافه تشخیص داده می‌شود.
+"""
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.utils.functional import cached_property
+
+CAP = 1000
+
+
+class CounterPaginator(Paginator):
+    exact = True
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        # جایگزین cached_property شمارش
+        self.count = count
+
+
+class CappedPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def next_page_number(self):
+        # بدون اعتبارسنجی با num_pages که ممکن است دقیق نباشد
+        return self.number + 1
+
+
+class CappedPaginator(Paginator):
+    def __init__(self, object_list, per_page, cap=CAP, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cap = cap
+
+    @cached_property
+    def count(self):
+        # SELECT COUNT(*) FROM (... LIMIT cap + 1)
+        return self.object_list[: self.cap + 1].count()
+
+    @property
+    def exact(self):
+        return self.count <= self.cap
+
+    def validate_number(self, number):
+        if self.exact:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def get_page(self, number):
+        try:
+            return super().get_page(number)
+        except EmptyPage:
+            # صفحه‌ای بعد از آخرین نتیجه؛ آخرین صفحه شمرده‌شده
+            return self.page(self.num_pages)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.exact:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        return CappedPage(
+            rows[: self.per_page], number, self, has_next=len(rows) > self.per_page
+        )
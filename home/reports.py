@@ -0,0 +1,194 @@
+"""
+گزارش دریافت/پرداخت در دوره‌های شمسی (ماهانه، فصلی، سالانه یا بازه دلخواه)
+به تفکیک حساب و دسته‌بندی.
+
+گزارش‌ها از جمع‌های روزانه CategoryDailyBalance ساخته می‌شوند که
+balances.post_entries همراه هر ثبت/ویرایش/حذف تراکنش به‌روز می‌کند؛ هزینه هر
+گزارش به تعداد روزهای بازه بستگی دارد نه تعداد تراکنش‌ها.
+"""
+
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+
+from django.db.models import Case, Count, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.db.transaction import atomic
+
+from .models import Account, CategoryDailyBalance, Transaction
+from . import categories, jalali
+
+PERIODS = {"month": 1, "quarter": 3, "year": 12}
+QUARTER_NAMES = ["بهار", "تابستان", "پاییز", "زمستان"]
+NO_CATEGORY = "بدون دسته‌بندی"
+
+TOTALS = {
+    "income": Sum("total_income"),
+    "expense": Sum("total_expense"),
+    "count": Sum("transaction_count"),
+}
+
+# start شامل و end غیرشامل، هر دو date میلادی
+Period = namedtuple("Period", "label start end")
+
+
+def periods(year, kind="month"):
+    """دوره‌های سال شمسی year؛ kind یکی از month / quarter / year."""
+    step = PERIODS[kind]
+    result = []
+    for index, month in enumerate(range(1, 13, step)):
+        next_month = month + step
+        start = jalali.to_gregorian(year, month, 1)
+        if next_month > 12:
+            end = jalali.to_gregorian(year + 1, next_month - 12, 1)
+        else:
+            end = jalali.to_gregorian(year, next_month, 1)
+        if kind == "month":
+            label = f"{jalali.MONTH_NAMES[month - 1]} {year}"
+        elif kind == "quarter":
+            label = f"{QUARTER_NAMES[index]} {year}"
+        else:
+            label = str(year)
+        result.append(Period(label, start, end))
+    return result
+
+
+def _row(label, values):
+    income = values.get("income") or 0
+    expense = values.get("expense") or 0
+    return {
+        "label": label,
+        "income": income,
+        "expense": expense,
+        "net": income - expense,
+        "count": values.get("count") or 0,
+    }
+
+
+def report(user, periods, account=None):
+    """
+    جمع هر دوره، هر دسته‌بندی و هر حساب برای دوره‌های پیوسته periods.
+    هر بخش با یک کوئری GROUP BY روی جمع‌های روزانه ساخته می‌شود.
+    """
+    rollups = CategoryDailyBalance.objects.filter(
+        account__user=user,
+        day__gte=periods[0].start,
+        day__lt=periods[-1].end,
+    )
+    if account is not None:
+        rollups = rollups.filter(account=account)
+
+    bucket = Case(
+        *[When(day__lt=period.end, then=Value(i)) for i, period in enumerate(periods)],
+        output_field=IntegerField(),
+    )
+    by_period = {
+        row["period"]: row
+        for row in rollups.annotate(period=bucket)
+        .values("period")
+        .annotate(**TOTALS)
+        .order_by()
+    }
+    by_category = (
+        rollups.values("category")
+        .annotate(**TOTALS)
+        .filter(count__gt=0)
+        .order_by("-expense", "-income")
+    )
+    accounts = (
+        rollups.values("account_id", "account__full_name")
+        .annotate(**TOTALS)
+        .filter(count__gt=0)
+        .order_by("account__full_name")
+    )
+
+    rows = [_row(period.label, by_period.get(i, {})) for i, period in enumerate(periods)]
+    names = categories.names(user.pk)
+    return {
+        "periods": rows,
+        "categories": [
+            _row(names.get(row["category"], NO_CATEGORY), row) for row in by_category
+        ],
+        "accounts": [
+            {**_row(row["account__full_name"], row), "account_id": row["account_id"]}
+            for row in accounts
+        ],
+        "total": _row(
+            "جمع",
+            {key: sum(row[key] for row in rows) for key in ("income", "expense", "count")},
+        ),
+    }
+
+
+def range_report(user, start, end, account=None):
+    """گزارش بازه دلخواه [start, end] (هر دو روز شامل)."""
+    label = f"{jalali.format_date(start)} تا {jalali.format_date(end)}"
+    return report(user, [Period(label, start, end + timedelta(days=1))], account)
+
+
+def _expected(accounts=None):
+    transactions = Transaction.objects.all()
+    if accounts is not None:
+        transactions = transactions.filter(account__in=accounts)
+    return (
+        transactions.annotate(day=TruncDate("date"))
+        .values("account_id", "day", "category_id")
+        .annotate(
+            income=Sum("amount", filter=Q(type="RE")),
+            expense=Sum("amount", filter=Q(type="EX")),
+            count=Count("id"),
+        )
+        .order_by()
+    )
+
+
+def rebuild(accounts=None):
+    """بازسازی کامل جمع‌های روزانه دسته‌بندی‌ها از روی جدول تراکنش‌ها."""
+    account_ids = Account.objects.all()
+    if accounts is not None:
+        account_ids = account_ids.filter(pk__in=accounts)
+    account_ids = list(account_ids.values_list("pk", flat=True))
+
+    rows = [
+        CategoryDailyBalance(
+            account_id=row["account_id"],
+            day=row["day"],
+            category=row["category_id"] or 0,
+            total_income=row["income"] or 0,
+            total_expense=row["expense"] or 0,
+            transaction_count=row["count"],
+        )
+        for row in _expected(account_ids).iterator()
+    ]
+    with atomic():
+        CategoryDailyBalance.objects.filter(account_id__in=account_ids).delete()
+        CategoryDailyBalance.objects.bulk_create(rows, batch_size=1000)
+    return len(account_ids), len(rows)
+
+
+def verify(accounts=None):
+    """مقایسه جمع‌های دسته‌بندی با جدول تراکنش‌ها؛ لیست اختلاف‌ها را برمی‌گرداند."""
+    rollups = CategoryDailyBalance.objects.exclude(transaction_count=0)
+    if accounts is not None:
+        rollups = rollups.filter(account__in=accounts)
+    stored = {
+        (row.account_id, row.day, row.category): (
+            row.total_income,
+            row.total_expense,
+            row.transaction_count,
+        )
+        for row in rollups
+    }
+    expected = defaultdict(lambda: (0, 0, 0))
+    for row in _expected(accounts).iterator():
+        expected[row["account_id"], row["day"], row["category_id"] or 0] = (
+            row["income"] or 0,
+            row["expense"] or 0,
+            row["count"],
+        )
+
+    mismatches = []
+    for key in expected.keys() | stored.keys():
+        actual = tuple(stored.get(key, (0, 0, 0)))
+        if actual != expected[key]:
+            mismatches.append((key, expected[key], actual))
+    return mismatches
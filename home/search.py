@@ -0,0 +1,235 @@
+"""
+جستجوی متنی حساب‌ها و توضیحات تراکنش‌ها روی جدول‌های FTS5 در SQLite.
+
+متن‌ها قبل از ذخیره و هنگام جستجو یکسان‌سازی می‌شوند (ی/ك عربی، ارقام فارسی و
+عربی، اعراب و نیم‌فاصله) و tokenizer از نوع trigram است تا رفتار جستجو مثل
+icontains (زیررشته) بماند ولی از ایندکس استفاده کند. برای عبارت‌های کوتاه‌تر
+از سه حرف یا دیتابیس غیر SQLite توابع None برمی‌گردانند و view به فیلتر قبلی
+برمی‌گردد.
+
+نتیجه جستجو (RankedIds) سقف ندارد: Paginator تعداد را با COUNT و هر صفحه را
+با LIMIT/OFFSET روی همان MATCH می‌خواند.
+"""
+
+from django.core.paginator import Paginator
+from django.db import connection
+
+from .models import Account, Transaction
+
+ACCOUNT_TABLE = "home_account_search"
+TRANSACTION_TABLE = "home_transaction_search"
+MIN_QUERY_LENGTH = 3
+
+CREATE_SQL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {ACCOUNT_TABLE} USING fts5(
+        full_name, address, email, phone_number,
+        user_id UNINDEXED, tokenize='trigram'
+    )""",
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TRANSACTION_TABLE} USING fts5(
+        description, user_id UNINDEXED, account_id UNINDEXED, tokenize='trigram'
+    )""",
+]
+DROP_SQL = [
+    f"DROP TABLE IF EXISTS {ACCOUNT_TABLE}",
+    f"DROP TABLE IF EXISTS {TRANSACTION_TABLE}",
+]
+
+_TRANSLATION = str.maketrans(
+    {
+        "ي": "ی",
+        "ى": "ی",
+        "ك": "ک",
+        "\u200c": " ",  # نیم‌فاصله
+        "ـ": None,  # کشیده
+        **{chr(code): None for code in range(0x064B, 0x0653)},  # اعراب
+        **{chr(0x06F0 + d): str(d) for d in range(10)},  # ارقام فارسی
+        **{chr(0x0660 + d): str(d) for d in range(10)},  # ارقام عربی
+    }
+)
+
+
+def normalize(text):
+    if not text:
+        return ""
+    return " ".join(str(text).translate(_TRANSLATION).casefold().split())
+
+
+def available():
+    return connection.vendor == "sqlite"
+
+
+def _match(query):
+    query = normalize(query)
+    if len(query) < MIN_QUERY_LENGTH or not available():
+        return None
+    return '"' + query.replace('"', '""') + '"'
+
+
+def _account_row(account):
+    return [
+        account.pk,
+        normalize(account.full_name),
+        normalize(account.address),
+        normalize(account.email),
+        normalize(account.phone_number),
+        account.user_id,
+    ]
+
+
+def _transaction_row(txn, user_id):
+    return [txn.pk, normalize(txn.description), user_id, txn.account_id]
+
+
+def index_accounts(accounts):
+    if not available():
+        return
+    rows = [_account_row(account) for account in accounts]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {ACCOUNT_TABLE} WHERE rowid = %s", [[r[0]] for r in rows]
+        )
+        cursor.executemany(
+            f"INSERT INTO {ACCOUNT_TABLE} "
+            "(rowid, full_name, address, email, phone_number, user_id) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def index_transactions(transactions, new=False):
+    """
+    ایندکس تراکنش‌ها؛ برای bulk_create که سیگنال post_save ندارد هم استفاده
+    می‌شود. new=True یعنی ردیف‌ها تازه ساخته شده‌اند و حذف قبلی لازم نیست.
+    """
+    if not available():
+        return
+    transactions = list(transactions)
+    owners = {
+        txn.account_id: txn.account.user_id
+        for txn in transactions
+        if Transaction.account.is_cached(txn)
+    }
+    missing = {txn.account_id for txn in transactions} - owners.keys()
+    if missing:
+        owners.update(
+            Account.objects.filter(pk__in=missing).values_list("pk", "user_id")
+        )
+    rows = [_transaction_row(txn, owners.get(txn.account_id)) for txn in transactions]
+    with connection.cursor() as cursor:
+        if not new:
+            cursor.executemany(
+                f"DELETE FROM {TRANSACTION_TABLE} WHERE rowid = %s",
+                [[r[0]] for r in rows],
+            )
+        _insert_transactions(cursor, rows)
+
+
+def unindex(table, pks):
+    if not available():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {table} WHERE rowid = %s", [[pk] for pk in pks]
+        )
+
+
+def rebuild(batch_size=5000):
+    """بازسازی کامل هر دو ایندکس از روی جدول‌های اصلی."""
+    if not available():
+        return 0, 0
+    with connection.cursor() as cursor:
+        for sql in DROP_SQL + CREATE_SQL:
+            cursor.execute(sql)
+
+    accounts = list(Account.objects.all())
+    index_accounts(accounts)
+    owners = {account.pk: account.user_id for account in accounts}
+    count = 0
+    batch = []
+    with connection.cursor() as cursor:
+        for txn in Transaction.objects.only("pk", "description", "account_id").iterator(
+            chunk_size=batch_size
+        ):
+            batch.append(_transaction_row(txn, owners.get(txn.account_id)))
+            if len(batch) >= batch_size:
+                count += _insert_transactions(cursor, batch)
+                batch = []
+        count += _insert_transactions(cursor, batch)
+    return len(accounts), count
+
+
+def _insert_transactions(cursor, rows):
+    if rows:
+        cursor.executemany(
+            f"INSERT INTO {TRANSACTION_TABLE} "
+            "(rowid, description, user_id, account_id) VALUES (%s, %s, %s, %s)",
+            rows,
+        )
+    return len(rows)
+
+
+class RankedIds:
+    """
+    شناسه‌های یک جستجو به ترتیب ارتباط، بدون خواندن همه آن‌ها: len با COUNT و
+    برش ([start:stop]) با LIMIT/OFFSET؛ همان رابطی که Paginator لازم دارد.
+    """
+
+    def __init__(self, table, match, user_id):
+        self.table = table
+        self.match = match
+        self.user_id = user_id
+        self._count = None
+
+    def _where(self):
+        return f"FROM {self.table} WHERE {self.table} MATCH %s AND user_id = %s"
+
+    def count(self):
+        if self._count is None:
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT count(*) {self._where()}", [self.match, self.user_id])
+                self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+        start, stop, _ = index.indices(self.count())
+        if stop <= start:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid {self._where()} ORDER BY rank LIMIT %s OFFSET %s",
+                [self.match, self.user_id, stop - start, start],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def _search(table, query, user_id):
+    match = _match(query)
+    if match is None:
+        return None
+    return RankedIds(table, match, user_id)
+
+
+def search_accounts(user, query):
+    """RankedIds حساب‌های کاربر برای query، یا None اگر ایندکس قابل استفاده نیست."""
+    return _search(ACCOUNT_TABLE, query, user.pk)
+
+
+def search_transactions(user, query):
+    """RankedIds تراکنش‌های کاربر برای query، یا None اگر ایندکس قابل استفاده نیست."""
+    return _search(TRANSACTION_TABLE, query, user.pk)
+
+
+def ranked_page(queryset, ids, page_number, per_page=20):
+    """صفحه‌بندی روی شناسه‌های رتبه‌بندی‌شده (RankedIds) و بارگذاری فقط ردیف‌های همان صفحه."""
+    page = Paginator(ids, per_page).get_page(page_number)
+    objects = queryset.in_bulk(page.object_list)
+    page.object_list = [objects[pk] for pk in page.object_list if pk in objects]
+    return page
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Account, Category, Transaction
+from . import auth, balances, categories, dashboard, search
+
+
+def owner_id(transaction):
+    if Transaction.account.is_cached(transaction):
+        return transaction.account.user_id
+    return (
+        Account.objects.filter(pk=transaction.account_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Account)
+def account_saved(sender, instance, **kwargs):
+    search.index_accounts([instance])
+    # نام حساب در صفحات cacheشده تراکنش‌ها هست
+    balances.bump_versions([instance.pk])
+    dashboard.invalidate(instance.user_id)
+
+
+@receiver(post_delete, sender=Account)
+def account_deleted(sender, instance, **kwargs):
+    search.unindex(search.ACCOUNT_TABLE, [instance.pk])
+    dashboard.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=Transaction)
+def transaction_saved(sender, instance, **kwargs):
+    search.index_transactions([instance])
+    dashboard.invalidate(owner_id(instance))
+
+
+@receiver(post_delete, sender=Transaction)
+def transaction_deleted(sender, instance, **kwargs):
+    search.unindex(search.TRANSACTION_TABLE, [instance.pk])
+    dashboard.invalidate(owner_id(instance))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, created=False, **kwargs):
+    categories.invalidate(instance.user_id)
+    dashboard.invalidate(instance.user_id)
+    if not created:
+        # نام دسته در صفحات cacheشده دفتر حساب و تراکنش‌ها هست
+        balances.bump_versions(
+            list(Account.objects.filter(user_id=instance.user_id).values_list("pk", flat=True))
+        )
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def user_changed(sender, instance, **kwargs):
+    # تغییر رمز (ResetPassword)، last_login و غیره؛ شیء cacheشده کاربر کهنه است
+    auth.invalidate(instance.pk)
+
+
+@receiver(user_logged_out)
+def logged_out(sender, request, user, **kwargs):
+    if user is not None:
+        auth.invalidate(user.pk)
@@ -0,0 +1,147 @@
+"""
+فایل‌های static با نام hash‌دار و نسخه‌های فشرده، و سرو آن‌ها از خود جنگو.
+
+CompressedManifestStaticFilesStorage هنگام collectstatic علاوه بر نام‌های
+hash‌دار (ManifestStaticFilesStorage) کنار هر فایل متنی نسخه .gz و در صورت نصب
+بودن پکیج brotli نسخه .br هم می‌سازد؛ فشرده‌سازی یک بار انجام می‌شود نه در هر
+درخواست.
+
+StaticFilesMiddleware فایل‌های STATIC_ROOT را قبل از session و auth سرو
+می‌کند: نسخه فشرده مطابق Accept-Encoding، و برای نام‌های hash‌دار
+Cache-Control با انقضای یک ساله و immutable، پس مرورگر در بازدیدهای بعدی
+اصلاً درخواستی نمی‌فرستد. با DEBUG خاموش است (runserver خودش static سرو
+می‌کند).
+"""
+
+import gzip
+import mimetypes
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags, quote_etag
+
+try:
+    import brotli
+except ImportError:  # اختیاری؛ بدون آن فقط gzip ساخته می‌شود
+    brotli = None
+
+COMPRESSIBLE = {".css", ".js", ".map", ".svg", ".json", ".txt", ".ttf", ".otf", ".eot", ".ico"}
+MIN_SIZE = 512
+# به ترتیب اولویت: (پسوند فایل، Content-Encoding)
+ENCODINGS = [(".br", "br"), (".gz", "gzip")]
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=0, must-revalidate"
+
+
+def compress(content):
+    """نسخه‌های فشرده‌ای که دست‌کم ۱۰٪ کوچک‌تر از فایل اصلی باشند: {پسوند: داده}."""
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(content, quality=11)
+    return {
+        suffix: data for suffix, data in variants.items() if len(data) < len(content) * 0.9
+    }
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | {self.hashed_files.get(self.hash_key(name)) for name in paths}
+        for name in sorted(filter(None, names)):
+            if Path(name).suffix.lower() not in COMPRESSIBLE or not self.exists(name):
+                continue
+            with self.open(name) as fp:
+                content = fp.read()
+            if len(content) < MIN_SIZE:
+                continue
+            for suffix, data in compress(content).items():
+                with open(self.path(name + suffix), "wb") as fp:
+                    fp.write(data)
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        stat = path.stat()
+        self.path = path
+        self.immutable = immutable
+        self.content_type = mimetypes.guess_type(path.name)[0] or (
+            "application/json" if path.suffix == ".map" else "application/octet-stream"
+        )
+        self.last_modified = http_date(stat.st_mtime)
+        self.etag = f"{int(stat.st_mtime):x}-{stat.st_size:x}"
+        self.variants = [
+            (encoding, path.with_name(path.name + suffix))
+            for suffix, encoding in ENCODINGS
+            if path.with_name(path.name + suffix).exists()
+        ]
+
+    def select(self, accept_encoding):
+        for encoding, path in self.variants:
+            if encoding in accept_encoding:
+                return encoding, path
+        return None, self.path
+
+
+def scan(root, hashed_names):
+    """{مسیر نسبی: StaticFile} برای همه فایل‌های STATIC_ROOT (به جز نسخه‌های فشرده)."""
+    files = {}
+    root = Path(root)
+    if not root.is_dir():
+        return files
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith(tuple(suffix for suffix, _ in ENCODINGS)):
+                continue
+            path = Path(directory) / filename
+            name = path.relative_to(root).as_posix()
+            files[name] = StaticFile(path, immutable=name in hashed_names)
+    return files
+
+
+def hashed_names():
+    """نام‌های hash‌دار از staticfiles.json؛ با storage بدون manifest خالی است."""
+    return set(getattr(staticfiles_storage, "hashed_files", {}).values())
+
+
+class StaticFilesMiddleware:
+    """
+    فهرست فایل‌ها یک بار هنگام بالا آمدن پروسه ساخته می‌شود؛ پس از
+    collectstatic پروسه باید دوباره راه‌اندازی شود (مثل هر deploy).
+    """
+
+    def __init__(self, get_response):
+        if settings.DEBUG or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = "/" + settings.STATIC_URL.strip("/") + "/"
+        self.files = scan(settings.STATIC_ROOT, hashed_names())
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD") and request.path.startswith(self.prefix):
+            static_file = self.files.get(request.path[len(self.prefix):])
+            if static_file is not None:
+                return self.serve(request, static_file)
+        return self.get_response(request)
+
+    def serve(self, request, static_file):
+        encoding, path = static_file.select(request.headers.get("Accept-Encoding", ""))
+        etag = quote_etag(f"{static_file.etag}-{encoding}" if encoding else static_file.etag)
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(path, "rb"), content_type=static_file.content_type)
+            if encoding:
+                response["Content-Encoding"] = encoding
+            response["Last-Modified"] = static_file.last_modified
+        response["ETag"] = etag
+        response["Cache-Control"] = IMMUTABLE if static_file.immutable else REVALIDATE
+        if static_file.variants:
+            response["Vary"] = "Accept-Encoding"
+        return response
@@ -1,11 +1,31 @@
+from decimal import Decimal, InvalidOperation
+
 from django import template
+from home import jalali
 
 register = template.Library()
 
-@register.filter
+FA_DIGITS = str.maketrans("0123456789", "۰۱۲۳۴۵۶۷۸۹")
+
+
+@register.filter(is_safe=True)
 def fa_digits(value):
-    fa_numbers = {
-        '0': '۰', '1': '۱', '2': '۲', '3': '۳', '4': '۴',
-        '5': '۵', '6': '۶', '7': '۷', '8': '۸', '9': '۹'
-    }
-    return ''.join(fa_numbers.get(ch, ch) for ch in str(value))
+    return str(value).translate(FA_DIGITS)
+
+
+@register.filter(is_safe=True)
+def fa_money(value):
+    # معادل intcomma|fa_digits در یک مرحله
+    if value is None or value == "":
+        return value
+    try:
+        number = value if isinstance(value, (int, Decimal)) else Decimal(str(value))
+        return f"{number:,}".translate(FA_DIGITS)
+    except (InvalidOperation, ValueError, TypeError):
+        return fa_digits(value)
+
+
+@register.filter(is_safe=True)
+def fa_jalali(value):
+    # معادل jalali|fa_digits
+    return jalali.format_date(value).translate(FA_DIGITS)
@@ -1,10 +1,8 @@
 from django import template
-from khayyam import JalaliDate
+from home import jalali as jalali_dates
 
 register = template.Library()
 
 @register.filter
 def jalali(value):
-    if not value:
-        return ""
-    return JalaliDate(value).strftime('%Y/%m/%d')
+    return jalali_dates.format_date(value)
@@ -1,3 +1,998 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import OperationalError, connection, connections
+from django.db.transaction import atomic
+from django.http import HttpResponse
+from django.templatetags.static import static
+from django.test import (
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .db import retry_on_busy
+from .forms import TransactionForm
+from .importer import import_transactions
+from .ledger import ledger_page
+from .middleware import ProfilingMiddleware
+from .models import Account, AccountBalance, Category, Product, Transaction
+from .pagination import CappedPaginator
+from .templatetags import fa_numbers
+from . import (
+    auth,
+    balances,
+    bulk,
+    categories,
+    dashboard,
+    inventory,
+    reports,
+    search,
+    staticfiles,
+)
+
+FILE_CACHE = "django.core.cache.backends.filebased.FileBasedCache"
+
+
+class AccountTestCase(TestCase):
+    """یک کاربر واردشده با یک حساب؛ add_rows تراکنش و حساب اضافه می‌کند."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser("owner", password="pass")
+        cls.account = Account.objects.create(full_name="حساب", user=cls.user)
+
+    def setUp(self):
+        # شناسه‌ها بعد از rollback هر تست دوباره استفاده می‌شوند
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def assertConstantQueries(self, url):
+        self.add_rows(1)
+        cache.clear()
+        small = self.count_queries(url)
+        self.add_rows(19)
+        cache.clear()
+        full = self.count_queries(url)
+        self.assertEqual(small, full)
+
+    def add_rows(self, count):
+        category = Category.objects.get_or_create(user=self.user, name="متفرقه")[0]
+        Transaction.objects.bulk_create(
+            Transaction(
+                account=self.account,
+                type="RE" if i % 2 else "EX",
+                amount=1000 + i,
+                category=category,
+                date=timezone.now(),
+            )
+            for i in range(count)
+        )
+        Account.objects.bulk_create(
+            Account(full_name=f"حساب {i}", user=self.user) for i in range(count)
+        )
+        balances.rebuild()
+        reports.rebuild()
+
+
+class QueryCountTests(AccountTestCase):
+    """تعداد کوئری‌های صفحات لیست نباید با تعداد ردیف‌های صفحه رشد کند."""
+
+    def test_transactions_list(self):
+        self.assertConstantQueries(reverse("home:transactions"))
+
+    def test_accounts_list(self):
+        self.assertConstantQueries(reverse("home:accounts"))
+
+    def test_account_ledger(self):
+        self.assertConstantQueries(
+            reverse("home:accounttransactions", args=[self.account.pk])
+        )
+
+    def test_admin_transaction_changelist(self):
+        self.assertConstantQueries(reverse("admin:home_transaction_changelist"))
+
+    def test_admin_account_changelist(self):
+        self.assertConstantQueries(reverse("admin:home_account_changelist"))
+
+    def test_transaction_str(self):
+        self.add_rows(20)
+        transactions = Transaction.objects.all()
+        with self.assertNumQueries(1):
+            [str(transaction) for transaction in transactions]
+
+
+class CappedPaginatorTests(AccountTestCase):
+    """شمارش محدود لیست‌های فیلترشده."""
+
+    def test_pages(self):
+        self.add_rows(20)
+        paginator = CappedPaginator(Transaction.objects.order_by("id"), 5, cap=10)
+        self.assertFalse(paginator.exact)
+        page = paginator.get_page(4)
+        self.assertEqual(len(page), 5)
+        self.assertFalse(page.has_next())
+        self.assertEqual(paginator.get_page(100).number, 3)
+
+
+class BulkTests(AccountTestCase):
+    """عملیات گروهی دفتر حساب با تعداد کوئری ثابت."""
+
+    def test_actions(self):
+        self.add_rows(20)
+        other = Account.objects.create(full_name="حساب دوم", user=self.user)
+        url = reverse("home:bulk_transactions", args=[self.account.pk])
+        ids = list(self.account.transactions.values_list("pk", flat=True)[:10])
+        Category.objects.create(user=self.user, name="خوراک")
+        categories.names(self.user.pk)
+        actions = [
+            {"action": "category", "category": "خوراک"},
+            {"action": "date", "date": "1402/07/18"},
+            {"action": "move", "account": other.pk},
+        ]
+        for data in actions:
+            # تعداد کوئری‌ها به تعداد ردیف‌های انتخاب‌شده بستگی ندارد
+            counts = []
+            for selected in (ids[:2], ids[2:]):
+                with CaptureQueriesContext(connection) as ctx:
+                    self.client.post(url, {**data, "ids": selected})
+                counts.append(len(ctx))
+            self.assertEqual(counts[0], counts[1])
+        self.assertEqual(other.transactions.filter(category__name="خوراک").count(), 10)
+
+        url = reverse("home:bulk_transactions", args=[other.pk])
+        response = self.client.post(url, {"action": "delete", "ids": ids[:5]}, follow=True)
+        self.assertContains(response, "5 تراکنش حذف شد.")
+        self.assertEqual(other.transactions.count(), 5)
+        self.assertEqual(balances.verify(), [])
+        self.assertEqual(reports.verify(), [])
+
+
+class FragmentCacheTests(AccountTestCase):
+    """cache HTML جدول دفتر حساب و لیست تراکنش‌ها."""
+
+    def test_ledger(self):
+        self.add_rows(20)
+        url = reverse("home:accounttransactions", args=[self.account.pk])
+        first = self.count_queries(url)
+        self.assertLess(self.count_queries(url), first)
+
+        transactions_url = reverse("home:transactions")
+        self.assertNotContains(self.client.get(transactions_url), "دسته تازه")
+        transaction = self.account.transactions.first()
+        self.client.post(
+            reverse("home:bulk_transactions", args=[self.account.pk]),
+            {"action": "category", "category": "دسته تازه", "ids": [transaction.pk]},
+        )
+        self.assertContains(self.client.get(transactions_url), "دسته تازه")
+
+
+class ConditionalGetTests(AccountTestCase):
+    """ETag و 304 برای دفتر حساب."""
+
+    def test_ledger(self):
+        self.add_rows(20)
+        url = reverse("home:accounttransactions", args=[self.account.pk])
+        self.client.get(url)  # کوکی CSRF
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(3):  # session، کاربر و نسخه حساب‌ها
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # حساب تازه در فرم عملیات گروهی و دسته تازه در datalist دیده می‌شوند
+        Account.objects.create(full_name="حساب تازه", user=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "حساب تازه")
+        etag = response["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(user=self.user, name="دسته دیگر")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "دسته دیگر")
+        etag = response["ETag"]
+
+        transaction = self.account.transactions.first()
+        self.client.post(
+            reverse("home:bulk_transactions", args=[self.account.pk]),
+            {"action": "category", "category": "دسته تازه", "ids": [transaction.pk]},
+        )
+        # پیام موفقیت هنوز نمایش داده نشده است
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_after_login(self):
+        self.add_rows(5)
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        url = reverse("home:accounttransactions", args=[self.account.pk])
+        client.get(url)  # کوکی CSRF
+        etag = client.get(url)["ETag"]
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # login راز CSRF را عوض می‌کند و توکن صفحه کش‌شده دیگر معتبر نیست
+        client.post(
+            reverse("home:login"),
+            {
+                "username": "owner",
+                "password": "pass",
+                "csrfmiddlewaretoken": client.cookies["csrftoken"].value,
+            },
+        )
+        client.get(reverse("home:home"))  # پیام ورود
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        transaction = self.account.transactions.first()
+        response = client.post(
+            reverse("home:bulk_transactions", args=[self.account.pk]),
+            {
+                "action": "category",
+                "category": "دسته تازه",
+                "ids": [transaction.pk],
+                "csrfmiddlewaretoken": response.context["csrf_token"],
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+
+
+class ReportsTests(AccountTestCase):
+    """گزارش دوره‌ای از جمع‌های روزانه."""
+
+    def test_constant_queries(self):
+        self.assertConstantQueries(reverse("home:reports") + "?period=quarter")
+
+
+class BalanceTests(AccountTestCase):
+    """جمع‌های ذخیره‌شده حساب بعد از هر نوشتن از راه viewها."""
+
+    def assertBalances(self, account, income, expense, count):
+        self.assertEqual(balances.verify(), [])
+        summary = balances.account_totals(account)
+        self.assertEqual(
+            (summary["total_income"], summary["total_expense"], summary["transaction_count"]),
+            (income, expense, count),
+        )
+
+    def test_views(self):
+        data = {"amount": "1000", "date": "1402/07/18", "description": "اجاره"}
+        self.client.post(reverse("home:transaction_register", args=[self.account.pk, "re"]), data)
+        self.client.post(
+            reverse("home:transaction_register", args=[self.account.pk, "ex"]),
+            {**data, "amount": "300"},
+        )
+        self.assertBalances(self.account, 1000, 300, 2)
+
+        transaction = self.account.transactions.get(type="RE")
+        self.client.post(
+            reverse("home:updatetransaction", args=[self.account.pk, transaction.pk]),
+            {**data, "amount": "1500", "date": "1402/08/01"},
+        )
+        self.assertBalances(self.account, 1500, 300, 2)
+
+        other = Account.objects.create(full_name="حساب دوم", user=self.user)
+        self.client.post(
+            reverse("home:bulk_transactions", args=[self.account.pk]),
+            {"action": "move", "account": other.pk, "ids": [transaction.pk]},
+        )
+        self.assertBalances(self.account, 0, 300, 1)
+        self.assertBalances(other, 1500, 0, 1)
+
+        expense = self.account.transactions.get()
+        self.client.post(reverse("home:deletetransaction", args=[self.account.pk, expense.pk]))
+        self.assertBalances(self.account, 0, 0, 0)
+        self.assertBalances(other, 1500, 0, 1)
+
+    def test_rebuild_command(self):
+        self.add_rows(4)
+        AccountBalance.objects.filter(account=self.account).update(total_income=0)
+        stdout = io.StringIO()
+        with self.assertRaises(CommandError):
+            call_command("rebuild_balances", "--verify", stdout=stdout)
+        self.assertIn(f"account={self.account.pk} day=total", stdout.getvalue())
+
+        call_command("rebuild_balances", "--account", str(self.account.pk), stdout=stdout)
+        call_command("rebuild_balances", "--verify", stdout=stdout)
+        self.assertIn("Balances are consistent.", stdout.getvalue())
+        self.assertEqual(balances.verify(), [])
+
+
+class LedgerTests(AccountTestCase):
+    """صفحه‌بندی دفتر حساب با cursor و مانده هر ردیف."""
+
+    def setUp(self):
+        super().setUp()
+        start = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        # چند تراکنش با تاریخ یکسان تا ترتیب (date, id) هم آزموده شود
+        Transaction.objects.bulk_create(
+            Transaction(
+                account=self.account,
+                type="EX" if i % 3 == 0 else "RE",
+                amount=100 + i,
+                date=start - timezone.timedelta(days=10 - i // 2),
+            )
+            for i in range(20)
+        )
+        balances.rebuild()
+        running, self.expected = 0, []
+        for txn in self.account.transactions.order_by("date", "id"):
+            running += txn.amount if txn.type == "RE" else -txn.amount
+            self.expected.append((txn.pk, running))
+
+    def rows(self, page):
+        return [(txn.pk, txn.balance) for txn in page]
+
+    def test_pages(self):
+        transactions = self.account.transactions.all()
+        page = ledger_page(transactions, page_size=6)
+        self.assertEqual(self.rows(page), self.expected[-6:])
+        self.assertIsNone(page.next_cursor)
+
+        # از آخرین صفحه به عقب
+        pages = [self.rows(page)]
+        while page.has_previous():
+            page = ledger_page(transactions, before=page.previous_cursor, page_size=6)
+            pages.insert(0, self.rows(page))
+        self.assertEqual([row for rows in pages for row in rows], self.expected)
+        self.assertEqual(len(pages[0]), 2)
+
+        # و از اولین صفحه به جلو
+        rows = self.rows(page)
+        while page.has_next():
+            page = ledger_page(transactions, after=page.next_cursor, page_size=6)
+            rows.extend(self.rows(page))
+        self.assertEqual(rows, self.expected)
+
+    def test_net_before_day(self):
+        transactions = list(self.account.transactions.all())
+        today = timezone.localdate()
+        for offset in range(12, -2, -1):
+            day = today - timezone.timedelta(days=offset)
+            expected = sum(
+                txn.amount if txn.type == "RE" else -txn.amount
+                for txn in transactions
+                if timezone.localdate(txn.date) < day
+            )
+            with self.subTest(day=day), self.assertNumQueries(1):
+                self.assertEqual(balances.net_before_day(self.account.pk, day), expected)
+
+    def test_invalid_cursor(self):
+        page = ledger_page(self.account.transactions.all(), after="نامعتبر", page_size=6)
+        self.assertEqual(self.rows(page), self.expected[-6:])
+
+
+class SearchTests(AccountTestCase):
+    """ایندکس FTS5 توضیحات تراکنش‌ها و نام حساب‌ها."""
+
+    def add(self, description, account=None):
+        return Transaction.objects.create(
+            account=account or self.account,
+            type="EX",
+            amount=100,
+            date=timezone.now(),
+            description=description,
+        )
+
+    def search(self, query):
+        ranked = search.search_transactions(self.user, query)
+        return None if ranked is None else list(ranked)
+
+    def test_normalization(self):
+        book = self.add("خريد كتاب")  # ی و ک عربی
+        bill = self.add("قبض شماره ۱۲۳۴")
+        self.assertEqual(self.search("خرید کتاب"), [book.pk])
+        self.assertEqual(self.search("كتاب"), [book.pk])
+        self.assertEqual(self.search("1234"), [bill.pk])
+        self.assertEqual(self.search("١٢٣٤"), [bill.pk])
+        self.assertIsNone(self.search("کت"))
+
+        account = Account.objects.create(full_name="علي كريمي", user=self.user)
+        self.assertEqual(list(search.search_accounts(self.user, "علی کریمی")), [account.pk])
+
+    def test_ranking(self):
+        once = self.add("اجاره مغازه و قبض برق و آب و گاز و تلفن")
+        twice = self.add("اجاره دفتر و اجاره انبار")
+        other = User.objects.create_user("other")
+        self.add("اجاره", Account.objects.create(full_name="دیگری", user=other))
+        self.assertEqual(self.search("اجاره"), [twice.pk, once.pk])
+
+    def test_index_sync(self):
+        transaction = self.add("هزینه حمل")
+        transaction.description = "هزینه بسته‌بندی"
+        transaction.save()
+        self.assertEqual(self.search("حمل"), [])
+        self.assertEqual(self.search("بسته"), [transaction.pk])
+
+        transaction.delete()
+        self.assertEqual(self.search("بسته"), [])
+
+        rows = [self.add(f"پیک شماره {i}") for i in range(3)]
+        other = Account.objects.create(full_name="حساب دوم", user=self.user)
+        moved = Transaction.objects.filter(pk__in=[rows[0].pk, rows[1].pk])
+        bulk.update(self.user, moved, account=other)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, account_id FROM {search.TRANSACTION_TABLE} ORDER BY rowid"
+            )
+            indexed = dict(cursor.fetchall())
+        self.assertEqual(
+            indexed, {rows[0].pk: other.pk, rows[1].pk: other.pk, rows[2].pk: self.account.pk}
+        )
+
+        bulk.delete(self.user, Transaction.objects.filter(pk=rows[2].pk))
+        self.assertEqual(sorted(self.search("پیک")), [rows[0].pk, rows[1].pk])
+
+    def test_ranked_pages(self):
+        # همه نتایج صفحه‌بندی می‌شوند، نه فقط چند نتیجه اول
+        ids = {self.add(f"قبض شماره {i}").pk for i in range(45)}
+        ranked = search.search_transactions(self.user, "قبض")
+        transactions = Transaction.objects.all()
+        with self.assertNumQueries(3):  # COUNT، شناسه‌های صفحه و ردیف‌ها
+            page = search.ranked_page(transactions, ranked, 3)
+        self.assertEqual((page.paginator.count, page.paginator.num_pages), (45, 3))
+        seen = set()
+        for number in (1, 2, 3):
+            seen.update(txn.pk for txn in search.ranked_page(transactions, ranked, number))
+        self.assertEqual(seen, ids)
+
+
+class ExportTests(AccountTestCase):
+    """خروجی CSV جریانی تراکنش‌ها با مانده جاری هر حساب."""
+
+    def setUp(self):
+        super().setUp()
+        self.second = Account.objects.create(full_name="حساب دوم", user=self.user)
+        category = Category.objects.create(user=self.user, name="خوراک")
+        day = timezone.make_aware(timezone.datetime(2023, 10, 10, 12))
+        for account, type_, amount, description in [
+            (self.account, "RE", 1000, "واریز"),
+            (self.account, "EX", 300, ""),
+            (self.second, "EX", 50, "قبض"),
+        ]:
+            Transaction.objects.create(
+                account=account,
+                type=type_,
+                amount=amount,
+                date=day,
+                category=category if description else None,
+                description=description,
+            )
+        other = User.objects.create_user("other")
+        Transaction.objects.create(
+            account=Account.objects.create(full_name="دیگری", user=other),
+            type="RE",
+            amount=1,
+            date=day,
+        )
+
+    def export(self, url):
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode("utf-8")
+        self.assertTrue(content.startswith("\ufeff"))
+        return content, list(csv.reader(io.StringIO(content[1:])))
+
+    def test_transactions(self):
+        content, rows = self.export(reverse("home:transactions_export"))
+        self.assertEqual(
+            rows[0], ["شماره", "حساب", "نوع", "مبلغ", "تاریخ", "دسته‌بندی", "توضیحات", "مانده"]
+        )
+        self.assertEqual(
+            [row[1:] for row in rows[1:]],
+            [
+                ["حساب", "دریافت", "1000", "1402/07/18", "خوراک", "واریز", "1000"],
+                ["حساب", "پرداخت", "300", "1402/07/18", "", "", "700"],
+                ["حساب دوم", "پرداخت", "50", "1402/07/18", "خوراک", "قبض", "-50"],
+            ],
+        )
+
+        # همان فایل دوباره قابل ورود است
+        result = import_transactions(io.StringIO(content), "csv", self.user)
+        self.assertEqual((result.created, result.errors), (3, []))
+
+    def test_formula_cells(self):
+        account = Account.objects.create(full_name="@حساب", user=self.user)
+        Transaction.objects.create(
+            account=account,
+            type="EX",
+            amount=70,
+            date=timezone.now(),
+            category=Category.objects.create(user=self.user, name="+هزینه"),
+            description='=HYPERLINK("http://example.com")',
+        )
+        url = reverse("home:accounttransactions_export", args=[account.pk])
+        content, rows = self.export(url)
+        self.assertEqual(
+            rows[1][1:],
+            [
+                "'@حساب",
+                "پرداخت",
+                "70",
+                rows[1][4],
+                "'+هزینه",
+                "'=HYPERLINK(\"http://example.com\")",
+                "-70",
+            ],
+        )
+        # مانده منفی عدد است، نه متن
+        self.assertIn(",-70\r\n", content)
+
+        result = import_transactions(io.StringIO(content), "csv", self.user)
+        self.assertEqual((result.created, result.errors), (1, []))
+        imported = account.transactions.order_by("-pk").first()
+        self.assertEqual(imported.description, '=HYPERLINK("http://example.com")')
+        self.assertEqual(imported.category.name, "+هزینه")
+
+    def test_account(self):
+        _, rows = self.export(reverse("home:accounttransactions_export", args=[self.second.pk]))
+        self.assertEqual([row[1] for row in rows[1:]], ["حساب دوم"])
+
+
+class ApiTests(AccountTestCase):
+    """API JSON: ثبت گروهی با خطای هر ردیف و صفحه‌بندی cursor."""
+
+    def test_api(self):
+        url = reverse("home:api_transactions")
+        rows = [
+            {"account": self.account.pk, "type": "RE", "amount": "1000", "date": "1402/07/18"},
+            {"account": self.account.pk, "type": "EX", "amount": "250", "date": "2023-10-11"},
+            {"account": self.account.pk, "type": "EX", "amount": "-1", "date": "1402/13/01"},
+        ]
+        response = self.client.post(url, rows, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["created"], 2)
+        self.assertEqual(response.json()["errors"][0]["index"], 2)
+        self.assertEqual(balances.verify(), [])
+
+        self.add_rows(20)
+        ids, cursor = [], None
+        while True:
+            params = {"fields": "amount", "limit": 5, **({"cursor": cursor} if cursor else {})}
+            page = self.client.get(url, params).json()
+            self.assertEqual({key for row in page["results"] for key in row}, {"amount"})
+            ids.extend(page["results"])
+            cursor = page["next"]
+            if cursor is None:
+                break
+        self.assertEqual(len(ids), 22)
+
+        # ردیف تازه با تاریخ گذشته هم بعد از cursor صفحه آخر دیده می‌شود
+        backdated = Transaction.objects.create(
+            account=self.account, type="EX", amount=10, date=timezone.now().replace(year=2000)
+        )
+        page = self.client.get(url, {"cursor": page["cursor"]}).json()
+        self.assertEqual([row["id"] for row in page["results"]], [backdated.pk])
+        page = self.client.get(url, {"cursor": page["cursor"]}).json()
+        self.assertEqual((page["results"], page["next"]), ([], None))
+        self.assertIsNotNone(page["cursor"])
+
+
+class CategoryTests(AccountTestCase):
+    """دسته‌بندی‌های هر کاربر: ساخت، تغییر نام و cache نام‌ها."""
+
+    def test_categories(self):
+        url = reverse("home:api_transactions")
+        row = {"account": self.account.pk, "type": "EX", "amount": "100", "date": "1402/07/18"}
+        rows = [{**row, "category": name} for name in ("خوراک", " خوراك ", "")]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, rows, content_type="application/json")
+        self.assertEqual(list(categories.names(self.user.pk).values()), ["خوراک"])
+        self.assertEqual(reports.verify(), [])
+        report = reports.range_report(self.user, date(2023, 10, 1), date(2023, 10, 31))
+        totals = {row["label"]: row["count"] for row in report["categories"]}
+        self.assertEqual(totals, {"خوراک": 2, reports.NO_CATEGORY: 1})
+
+        transaction = self.account.transactions.filter(category__isnull=False).first()
+        url = reverse("home:updatetransaction", args=[self.account.pk, transaction.pk])
+        self.assertContains(self.client.get(url), 'value="خوراک"')
+
+    def test_no_category_without_transaction(self):
+        data = {"amount": "100", "date": "1402/07/18", "category": "اجاره"}
+        url = reverse("home:transaction_register", args=[self.account.pk, "xx"])
+        self.client.post(url, data)
+        url = reverse("home:bulk_transactions", args=[self.account.pk])
+        self.client.post(url, {"action": "category", "category": "اجاره", "ids": [0]})
+        url = reverse("home:transaction_register", args=[self.account.pk, "ex"])
+        with mock.patch("home.balances.record", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(url, data)
+        self.assertFalse(Category.objects.filter(user=self.user).exists())
+        self.assertFalse(self.account.transactions.exists())
+
+
+class TransactionFormTests(AccountTestCase):
+    """فرم ثبت تراکنش."""
+
+    def test_transaction_form_default_date(self):
+        # پیش‌فرض تاریخ هنگام ساخت فرم حساب می‌شود، نه هنگام import ماژول
+        with mock.patch("home.jalali.timezone.localdate", return_value=date(2024, 3, 20)):
+            self.assertEqual(TransactionForm()["date"].initial, "1403/01/01")
+        with mock.patch("home.jalali.timezone.localdate", return_value=date(2024, 3, 21)):
+            self.assertEqual(TransactionForm()["date"].initial, "1403/01/02")
+
+
+class DashboardTests(AccountTestCase):
+    """cache جمع‌های داشبورد."""
+
+    def test_invalidate_after_commit(self):
+        key = dashboard.cache_key(self.user.pk)
+        cache.set(key, {"balance": 0})
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(
+                account=self.account, type="RE", amount=1000, date=timezone.now()
+            )
+            # خواننده‌ها تا commit همان جمع‌های قبلی را می‌بینند
+            self.assertIsNotNone(cache.get(key))
+        self.assertIsNone(cache.get(key))
+
+    def test_repeat_load_skips_aggregates(self):
+        self.add_rows(6)
+        url = reverse("home:home")
+
+        def aggregates():
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.context["dashboard"]["balance"], 3)
+            return [q["sql"] for q in ctx.captured_queries if "SUM(" in q["sql"]]
+
+        self.assertTrue(aggregates())
+        self.assertEqual(aggregates(), [])
+
+
+class ImporterTests(AccountTestCase):
+    """ورود CSV، JSON Lines و خروجی dumpdata با خطای هر ردیف."""
+
+    def run_import(self, content, fmt):
+        return import_transactions(io.StringIO(content), fmt, self.user)
+
+    def test_csv(self):
+        content = (
+            "حساب,نوع,مبلغ,تاریخ,دسته‌بندی,توضیحات\n"
+            "حساب,دریافت,\"۱,۲۰۰\",۱۴۰۲/۰۷/۱۸,خوراك,ناهار\n"
+            "حساب,پرداخت,300,2023-10-11,,\n"
+        )
+        result = self.run_import(content, "csv")
+        self.assertEqual((result.created, result.errors), (2, []))
+        received = self.account.transactions.get(type="RE")
+        self.assertEqual(received.amount, 1200)
+        self.assertEqual(timezone.localdate(received.date), date(2023, 10, 10))
+        self.assertEqual(received.category.name, "خوراک")
+        self.assertEqual(reports.verify(), [])
+
+    def test_json_lines(self):
+        rows = [
+            {"account": self.account.pk, "type": "EX", "amount": 500, "date": "1402-7-18"},
+            {"account": self.account.pk, "type": "RE", "amount": "70", "date": "2023-10-11T08:30:00Z"},
+        ]
+        result = self.run_import("\n".join(json.dumps(row) for row in rows), "json")
+        self.assertEqual((result.created, result.errors), (2, []))
+        # ماه یک‌رقمی شمسی است، نه سال ۱۴۰۲ میلادی
+        dates = sorted(timezone.localdate(t.date) for t in self.account.transactions.all())
+        self.assertEqual(dates, [date(2023, 10, 10), date(2023, 10, 11)])
+
+    def test_dumpdata(self):
+        rows = [
+            {"model": "home.account", "pk": 99, "fields": {"full_name": "حساب قدیمی"}},
+            {
+                "model": "home.transaction",
+                "pk": 1,
+                "fields": {"account": 99, "type": "RE", "amount": "1000.00", "date": "2023-10-11"},
+            },
+            {"model": "auth.user", "pk": 1, "fields": {}},
+        ]
+        result = self.run_import(json.dumps(rows), "json")
+        self.assertEqual((result.accounts_created, result.created, result.errors), (1, 1, []))
+        account = Account.objects.get(user=self.user, full_name="حساب قدیمی")
+        self.assertEqual(account.transactions.get().amount, 1000)
+
+    def test_row_errors(self):
+        row = {"account": self.account.pk, "type": "EX", "amount": "10"}
+        rows = [
+            {**row, "date": "2023-02-30"},
+            {**row, "date": "1402-13-01"},
+            {**row, "date": "1402-07-18T10:00:00"},
+            {**row, "date": "1402/07/18", "amount": "-5"},
+            {**row, "date": "1402/07/18"},
+        ]
+        result = self.run_import(json.dumps(rows), "json")
+        self.assertEqual(result.created, 1)
+        self.assertEqual([line for line, _ in result.errors], [1, 2, 3, 4])
+        self.assertEqual(self.account.transactions.count(), 1)
+
+
+class ProfilingTests(AccountTestCase):
+    """ProfilingMiddleware: Server-Timing، کوئری‌های تکراری و پروفایل درخواست‌های کند."""
+
+    def profile(self, get_response, **options):
+        with override_settings(PROFILING={"ENABLED": True, **options}):
+            middleware = ProfilingMiddleware(get_response)
+        return middleware(RequestFactory().get("/"))
+
+    def test_server_timing(self):
+        with override_settings(PROFILING={"ENABLED": True}):
+            client = Client()
+            client.force_login(self.user)
+            with self.assertLogs("home.profiling", "INFO") as logs:
+                with CaptureQueriesContext(connection) as ctx:
+                    response = client.get(reverse("home:accounts"))
+        self.assertIn(f"sql={len(ctx)} ", logs.output[0])
+        match = re.fullmatch(
+            r'app;dur=[\d.]+, sql;dur=[\d.]+;desc="(\d+) queries"', response["Server-Timing"]
+        )
+        self.assertIsNotNone(match)
+        self.assertEqual(int(match.group(1)), len(ctx))
+
+    def test_duplicate_queries(self):
+        def get_response(times):
+            def view(request):
+                for pk in range(times):
+                    list(Account.objects.filter(pk=pk))
+                return HttpResponse()
+
+            return view
+
+        with self.assertLogs("home.profiling", "WARNING") as logs:
+            self.profile(get_response(3), DUPLICATE_THRESHOLD=3)
+        self.assertIn("query repeated 3 times", logs.output[0])
+        with self.assertNoLogs("home.profiling", "WARNING"):
+            self.profile(get_response(2), DUPLICATE_THRESHOLD=3)
+
+    def test_slow_request_saved(self):
+        for profiler, suffix in (("cprofile", ".prof"), ("sample", ".folded")):
+            with tempfile.TemporaryDirectory() as directory:
+                with self.assertLogs("home.profiling", "WARNING"):
+                    self.profile(
+                        lambda request: HttpResponse(),
+                        PROFILER=profiler,
+                        PROFILE_DIR=directory,
+                        SLOW_MS=0,
+                    )
+                self.assertEqual([path.suffix for path in Path(directory).iterdir()], [suffix])
+
+    def test_disabled(self):
+        with override_settings(PROFILING={"ENABLED": False}):
+            with self.assertRaises(MiddlewareNotUsed):
+                ProfilingMiddleware(lambda request: HttpResponse())
+
+
+@override_settings(
+    SESSION_ENGINE="django.contrib.sessions.backends.cached_db",
+    AUTHENTICATION_BACKENDS=["home.auth.CachedModelBackend"],
+)
+class SessionCacheTests(AccountTestCase):
+    """تنظیمات ACCOUNTING_SESSION_CACHE: session و کاربر از cache."""
+
+    def setUp(self):
+        caches[settings.SESSION_CACHE_ALIAS].clear()
+        super().setUp()
+
+    def test_no_session_queries_when_warm(self):
+        url = reverse("home:accounts")
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        tables = ("django_session", "auth_user")
+        self.assertFalse(
+            [q for q in ctx.captured_queries if any(t in q["sql"] for t in tables)]
+        )
+
+        # تغییر رمز کاربر cacheشده را باطل می‌کند و session قدیمی دیگر معتبر نیست
+        other = Client()
+        other.force_login(self.user)
+        self.client.post(
+            reverse("home:resetpassword"),
+            {
+                "old_password": "pass",
+                "new_password": "new-pass",
+                "confirm_password": "new-pass",
+            },
+        )
+        self.assertEqual(other.get(url).status_code, 302)
+
+    def test_local_cache_warning(self):
+        # cache محلی هر پروسه خروج و تغییر رمز را به workerهای دیگر نمی‌رساند
+        self.assertEqual([m.id for m in auth.check_shared_cache(None)], ["home.W001"])
+        shared = {**settings.CACHES, "sessions": {"BACKEND": FILE_CACHE, "LOCATION": "/tmp"}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(auth.check_shared_cache(None), [])
+
+
+class RetryOnBusyTests(TransactionTestCase):
+    """retry_on_busy؛ TransactionTestCase چون TestCase همه چیز را در atomic اجرا می‌کند."""
+
+    def busy(self, failures):
+        calls = []
+
+        def write():
+            calls.append(None)
+            if len(calls) <= failures:
+                raise OperationalError("database is locked")
+            return len(calls)
+
+        return write, calls
+
+    def setUp(self):
+        patcher = mock.patch("home.db.time.sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_retry_then_succeed(self):
+        write, _ = self.busy(2)
+        with self.assertLogs("home.db", "WARNING") as logs:
+            self.assertEqual(retry_on_busy(write)(), 3)
+        self.assertEqual((len(logs.output), self.sleep.call_count), (2, 2))
+
+    def test_last_attempt_raises(self):
+        write, calls = self.busy(10)
+        with self.assertLogs("home.db", "WARNING"), self.assertRaises(OperationalError):
+            retry_on_busy(attempts=3)(write)()
+        self.assertEqual(len(calls), 3)
+
+    def test_no_retry_in_outer_atomic(self):
+        write, calls = self.busy(1)
+        with atomic(), self.assertRaises(OperationalError):
+            retry_on_busy(write)()
+        self.assertEqual(len(calls), 1)
+        self.sleep.assert_not_called()
+
+
+class InventoryConcurrencyTests(TransactionTestCase):
+    """فروشندگان همزمان نباید تغییر موجودی یکدیگر را گم کنند."""
+
+    sellers = 8
+    sales = 25
+
+    def setUp(self):
+        self.user = User.objects.create_user("seller")
+        self.product = Product.objects.create(
+            user=self.user, name="کالا", price=1000, purchaseprice=800
+        )
+        inventory.move(self.user, self.product.pk, 1000, kind="IN")
+
+    def sell(self, lock):
+        """فروش همزمان؛ تعداد واحدهای فروخته‌شده را برمی‌گرداند."""
+        post = retry_on_busy(inventory.post_invoice)
+
+        def seller(index):
+            sold = 0
+            try:
+                for _ in range(self.sales):
+                    try:
+                        post(self.user, inventory.SALE, [(self.product.pk, 2, 1000)], lock=lock)
+                    except inventory.InsufficientStock:
+                        continue
+                    sold += 2
+            finally:
+                connections.close_all()
+            return sold
+
+        with ThreadPoolExecutor(self.sellers) as pool:
+            return sum(pool.map(seller, range(self.sellers)))
+
+    def assertNoLostUpdates(self, sold, stock=1000):
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, stock - sold)
+        self.assertEqual(inventory.verify(), [])
+
+    def test_parallel_sellers(self):
+        sold = self.sell(lock=False)
+        self.assertEqual(sold, 2 * self.sellers * self.sales)
+        self.assertNoLostUpdates(sold)
+
+    def test_parallel_sellers_with_lock(self):
+        sold = self.sell(lock=True)
+        self.assertEqual(sold, 2 * self.sellers * self.sales)
+        self.assertNoLostUpdates(sold)
+
+    def test_no_oversell(self):
+        # 400 واحد درخواست برای 101 واحد موجودی
+        for lock in (False, True):
+            with self.subTest(lock=lock):
+                self.product.refresh_from_db()
+                inventory.move(self.user, self.product.pk, 101 - self.product.stock)
+                sold = self.sell(lock=lock)
+                self.assertEqual(sold, 100)
+                self.assertNoLostUpdates(sold, 101)
+
+    def test_insufficient_stock(self):
+        with self.assertRaises(inventory.InsufficientStock):
+            inventory.post_invoice(
+                self.user,
+                inventory.SALE,
+                [(self.product.pk, 1, 1000), (self.product.pk, 1000, 1000)],
+            )
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 1000)
+        self.assertEqual(inventory.verify(), [])
+
+
+class TemplateFilterTests(SimpleTestCase):
+    """فیلترهای fa_money و fa_jalali."""
+
+    def test_fa_money(self):
+        cases = [
+            (None, None),
+            ("", ""),
+            (1234567, "۱,۲۳۴,۵۶۷"),
+            (-1234567, "-۱,۲۳۴,۵۶۷"),
+            (Decimal("1000"), "۱,۰۰۰"),
+            (Decimal("-2500.50"), "-۲,۵۰۰.۵۰"),
+            ("1234567", "۱,۲۳۴,۵۶۷"),
+            ("-12.5", "-۱۲.۵"),
+            ("نامعلوم", "نامعلوم"),
+        ]
+        for value, expected in cases:
+            with self.subTest(value=value):
+                self.assertEqual(fa_numbers.fa_money(value), expected)
+
+    @override_settings(TIME_ZONE="Asia/Tehran")
+    def test_fa_jalali(self):
+        self.assertEqual(fa_numbers.fa_jalali(None), "")
+        self.assertEqual(fa_numbers.fa_jalali(""), "")
+        self.assertEqual(fa_numbers.fa_jalali(date(2024, 3, 20)), "۱۴۰۳/۰۱/۰۱")
+        # 22:00 UTC در تهران روز بعد است
+        value = timezone.datetime(2024, 3, 20, 22, tzinfo=ZoneInfo("UTC"))
+        self.assertEqual(fa_numbers.fa_jalali(value), "۱۴۰۳/۰۱/۰۲")
+        value = timezone.datetime(2024, 3, 21, 1, tzinfo=ZoneInfo("America/New_York"))
+        self.assertEqual(fa_numbers.fa_jalali(value), "۱۴۰۳/۰۱/۰۲")
+
+
+class StaticFilesTests(SimpleTestCase):
+    """collectstatic با نسخه‌های فشرده و سرو آن‌ها با cache دائمی."""
+
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        storages = {
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            "staticfiles": {"BACKEND": "home.staticfiles.CompressedManifestStaticFilesStorage"},
+        }
+        overrides = override_settings(STATIC_ROOT=root.name, STORAGES=storages)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        call_command("collectstatic", interactive=False, verbosity=0, ignore_patterns=["admin"])
+
+    def test_compressed_immutable(self):
+        url = static("css/bootstrap.min.css")
+        self.assertNotEqual(url, "/static/css/bootstrap.min.css")
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Cache-Control"], staticfiles.IMMUTABLE)
+        self.assertLess(int(response["Content-Length"]), 50_000)
+
+        response = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response["ETag"], HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get("/static/css/bootstrap.min.css")
+        self.assertNotIn("Content-Encoding", response)
+        self.assertEqual(response["Cache-Control"], staticfiles.REVALIDATE)
@@ -16,7 +16,7 @@ Including another URLconf
 """
 
 from django.urls import path
-from . import views
+from . import api, views
 from django.contrib.auth import views as auth_views
 
 
@@ -36,10 +36,21 @@ urlpatterns = [
     path("account/<int:pk>/", views.SelectAccountView.as_view(), name="account"),
     # transaction
     path("transactions/", views.TransactionsView.as_view(), name="transactions"),
+    path("transactions/export/", views.ExportTransactionsView.as_view(), name="transactions_export"),
+    path("transactions/import/", views.ImportTransactionsView.as_view(), name="transactions_import"),
     path("accounttransactions/<int:account_pk>/", views.AccountTransactionsView.as_view(), name="accounttransactions"),
+    path("accounttransactions/<int:account_pk>/export/", views.ExportAccountTransactionsView.as_view(), name="accounttransactions_export"),
     path("registertransaction/<int:account_pk>/<str:transaction_type>/", views.RegisterTransactionsView.as_view(), name="transaction_register"),
+    path("accounttransactions/<int:account_pk>/bulk/", views.BulkTransactionsView.as_view(), name="bulk_transactions"),
     path("deletetransaction/<int:account_pk>/<int:pk>/", views.DeleteTransactionsView.as_view(), name="deletetransaction"),
     path("updatetransaction/<int:account_pk>/<int:pk>/", views.UpdateTransactionsView.as_view(), name="updatetransaction"),
+    # reports
+    path("reports/", views.ReportsView.as_view(), name="reports"),
+    # api
+    path("api/accounts/", api.AccountsApiView.as_view(), name="api_accounts"),
+    path("api/accounts/<int:pk>/", api.AccountApiView.as_view(), name="api_account"),
+    path("api/transactions/", api.TransactionsApiView.as_view(), name="api_transactions"),
+    path("api/transactions/<int:pk>/", api.TransactionApiView.as_view(), name="api_transaction"),
 
 
 ]
@@ -1,17 +1,35 @@
-import re
-from khayyam import JalaliDate
 from django.core.exceptions import ValidationError
+from .jalali import DATE_PATTERN, parse
+
+FORMAT_MESSAGE = "فرمت تاریخ باید به صورت YYYY/MM/DD  باشد."
+RANGE_MESSAGE = "تاریخ وارد شده معتبر نیست یا خارج از محدوده است."
+
 
 def validate_custom_date_format(value):
     # بررسی فرمت عددی: YYYY/MM/DD یا YYYY-MM-DD
-    pattern = r'^\d{4}[-/]\d{2}[-/]\d{2}$'
-    if not re.match(pattern, value):
-        raise ValidationError("فرمت تاریخ باید به صورت YYYY/MM/DD  باشد.")
+    if not DATE_PATTERN.match(value):
+        raise ValidationError(FORMAT_MESSAGE)
 
     # بررسی اعتبار واقعی تاریخ شمسی
     try:
-        parts = re.split(r'[-/]', value)
-        year, month, day = map(int, parts)
-        JalaliDate(year, month, day)  # اگر نامعتبر باشه، خطا می‌ده
-    except Exception:
-        raise ValidationError("تاریخ وارد شده معتبر نیست یا خارج از محدوده است.")
+        parse(value)  # اگر نامعتبر باشه، خطا می‌ده
+    except ValueError:
+        raise ValidationError(RANGE_MESSAGE)
+
+
+def validate_jalali_dates(values):
+    """
+    نسخه دسته‌ای validate_custom_date_format برای ورود گروهی: هر مقدار متمایز
+    فقط یک بار بررسی و تبدیل می‌شود. خروجی dict از مقدار به تاریخ میلادی یا
+    ValidationError است.
+    """
+    results = {}
+    for value in set(values):
+        if not DATE_PATTERN.match(value):
+            results[value] = ValidationError(FORMAT_MESSAGE)
+            continue
+        try:
+            results[value] = parse(value)
+        except ValueError:
+            results[value] = ValidationError(RANGE_MESSAGE)
+    return results
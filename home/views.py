@@ -1,48 +1,90 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views import View
+from django.http import StreamingHttpResponse
 from .models import Account, Transaction
+from .ledger import ledger_page
+from .export import csv_stream, ledger_rows
+from .importer import import_transactions
+from .db import retry_on_busy
+from .pagination import CappedPaginator, CounterPaginator
+from . import (
+    balances,
+    bulk,
+    categories,
+    conditional,
+    dashboard,
+    fragments,
+    jalali,
+    reports,
+    search,
+)
 from .forms import (
     AccountForm,
     TransactionForm,
+    BulkTransactionsForm,
     SignUpForm,
     LoginForm,
     ResetPasswordForm,
     CustomUserCreationForm,
+    ImportTransactionsForm,
+    ReportForm,
 )
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.db.models import Q
 from django.core.paginator import Paginator
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Sum
+from django.db.transaction import atomic
 from django.contrib.auth import login, logout, authenticate
-from khayyam import JalaliDate
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+
+
+def export_response(transactions, filename):
+    # پاسخ جریانی: حافظه ثابت و ارسال اولین بایت پیش از پایان کوئری
+    response = StreamingHttpResponse(
+        csv_stream(ledger_rows(transactions)), content_type="text/csv; charset=utf-8"
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
 
 
 class HomeView(View):
     def get(self, request):
-        return render(
-            request,
-            "home/home.html",
-        )
+        context = {}
+        if request.user.is_authenticated:
+            context["dashboard"] = dashboard.get_dashboard(request.user)
+        return render(request, "home/home.html", context)
 
 
 class AccountsView(LoginRequiredMixin, View):
+    @method_decorator(conditional.list_condition)
     def get(self, request):
         query = request.GET.get("q", "")
+        page_number = request.GET.get("page")
         accounts = Account.objects.filter(user=request.user).order_by("-id")
+        ranked = search.search_accounts(request.user, query) if query else None
 
-        if query:
-            accounts = accounts.filter(
-                Q(full_name__icontains=query)
-                | Q(address__icontains=query)
-                | Q(email__icontains=query)
-                | Q(phone_number__icontains=query)
-            ).order_by("-id")
-        paginator = Paginator(accounts, 20)  # نمایش ۱۰ حساب در هر صفحه
-        page_number = request.GET.get("page")
-        page_obj = paginator.get_page(page_number)
+        if ranked is not None:
+            page_obj = search.ranked_page(accounts, ranked, page_number)
+        else:
+            if query:
+                accounts = accounts.filter(
+                    Q(full_name__icontains=query)
+                    | Q(address__icontains=query)
+                    | Q(email__icontains=query)
+                    | Q(phone_number__icontains=query)
+                ).order_by("-id")
+                # شمارش icontains به اندازه خود جستجو گران است؛ فقط تا CAP
+                paginator = CappedPaginator(accounts, 20)
+            else:
+                # COUNT روی ایندکس user_id؛ ارزان است
+                paginator = Paginator(accounts, 20)
+            page_obj = paginator.get_page(page_number)
 
-        return render(request, "home/accounts.html", {"accounts": page_obj})
+        return render(
+            request, "home/accounts.html", {"accounts": page_obj, "query": query}
+        )
 
 
 class AccountRegisterView(LoginRequiredMixin, View):
@@ -52,12 +94,14 @@ class AccountRegisterView(LoginRequiredMixin, View):
         form = self.form_class()
         return render(request, "home/account_register.html", {"form": form})
 
+    @method_decorator(retry_on_busy)
     def post(self, request):
         form = self.form_class(request.POST)
         if form.is_valid():
             account = form.save(commit=False)
             account.user = request.user
-            account.save()
+            with atomic():
+                account.save()
             messages.success(request, "حساب جدید ثبت شد.", "success")
             return redirect("home:accounts")
         return render(request, "home/account_register.html", {"form": form})
@@ -79,9 +123,11 @@ class DeleteAccountView(LoginRequiredMixin, View):
 
         return render(request, "home/delete_confirm.html", {"account": account})
 
+    @method_decorator(retry_on_busy)
     def post(self, request, pk):
         account = get_object_or_404(Account, user=request.user, pk=pk)
-        account.delete()
+        with atomic():
+            account.delete()
         return redirect("home:accounts")
 
 
@@ -93,11 +139,13 @@ class EditAccountView(LoginRequiredMixin, View):
             request, "home/edit_account.html", {"form": form, "account": account}
         )
 
+    @method_decorator(retry_on_busy)
     def post(self, request, pk):
         account = get_object_or_404(Account, user=request.user, pk=pk)
         form = AccountForm(request.POST, instance=account)
         if form.is_valid():
-            form.save()
+            with atomic():
+                form.save()
             messages.success(request, "حساب با موفقیت ویرایش شد.", "success")
             return redirect("home:accounts")
         # یا هر صفحه‌ای که لیست حساب‌ها رو نشون می‌ده
@@ -123,64 +171,125 @@ class SelectAccountView(LoginRequiredMixin, View):
 
 
 class TransactionsView(LoginRequiredMixin, View):
+    @method_decorator(conditional.list_condition)
     def get(self, request):
         query = request.GET.get("q", "")
-        transactions = Transaction.objects.filter(account__user=request.user)
-        if query:
-            transactions = transactions.filter(description__icontains=query)
-
-        transactions = transactions.order_by("-created_at")  # اختیاری
-        paginator = Paginator(transactions, 20)
         page_number = request.GET.get("page")
-        page_obj = paginator.get_page(page_number)
-
+        # نسخه و تعداد تراکنش‌های هر حساب کاربر (همان که برای ETag خوانده شد)؛
+        # کلید cache جدول صفحه
+        versions = conditional.user_versions(request)
+        transactions_table = fragments.render_cached(
+            fragments.transactions_key(request.user.pk, versions, page_number, query),
+            "home/transactions_table.html",
+            lambda: {
+                "transactions": self.get_page(request.user, query, page_number, versions),
+                "query": query,
+            },
+        )
         context = {
-            "transactions": page_obj,
+            "transactions_table": transactions_table,
             "query": query,
         }
         return render(request, "home/transactions.html", context)
 
+    def get_page(self, user, query, page_number, versions):
+        transactions = Transaction.objects.filter(account__user=user).select_related(
+            "account", "category"
+        )
+        ranked = search.search_transactions(user, query) if query else None
+
+        if ranked is not None:
+            page_obj = search.ranked_page(transactions, ranked, page_number)
+        else:
+            transactions = transactions.order_by("-created_at")
+            if query:
+                transactions = transactions.filter(description__icontains=query)
+                paginator = CappedPaginator(transactions, 20)
+            else:
+                # تعداد از AccountBalance به جای COUNT روی همه تراکنش‌های کاربر
+                paginator = CounterPaginator(
+                    transactions, 20, sum(row[2] for row in versions)
+                )
+            page_obj = paginator.get_page(page_number)
+        return page_obj
+
+
+class ExportTransactionsView(LoginRequiredMixin, View):
+    def get(self, request):
+        transactions = Transaction.objects.filter(account__user=request.user)
+        return export_response(transactions, "transactions.csv")
+
+
+class ImportTransactionsView(LoginRequiredMixin, View):
+    form_class = ImportTransactionsForm
+    template = "home/import_transactions.html"
+
+    def get(self, request):
+        form = self.form_class(user=request.user)
+        return render(request, self.template, {"form": form})
+
+    def post(self, request):
+        form = self.form_class(request.POST, request.FILES, user=request.user)
+        if not form.is_valid():
+            return render(request, self.template, {"form": form})
+
+        file = form.cleaned_data["file"]
+        fmt = "csv" if file.name.lower().endswith(".csv") else "json"
+        try:
+            result = import_transactions(
+                file, fmt, request.user, form.cleaned_data["account"]
+            )
+        except ValidationError as e:
+            messages.warning(request, "؛ ".join(e.messages), "warning")
+            return render(request, self.template, {"form": form})
+
+        if result.created:
+            messages.success(
+                request, f"{result.created} تراکنش با موفقیت ثبت شد.", "success"
+            )
+        if result.error_count:
+            messages.warning(
+                request, f"{result.error_count} ردیف ثبت نشد.", "warning"
+            )
+        return render(
+            request,
+            self.template,
+            {"form": self.form_class(user=request.user), "result": result},
+        )
+
 
 class AccountTransactionsView(LoginRequiredMixin, View):
+    @method_decorator(conditional.ledger_condition)
     def get(self, request, account_pk):
         account = get_object_or_404(Account, user=request.user, id=account_pk)
-        transactions = account.transactions.all().order_by("-created_at")
-        summary = transactions.aggregate(
-            total_income=Sum("amount", filter=Q(type="RE")),
-            total_expense=Sum("amount", filter=Q(type="EX")),
-        )
-
-        if summary["total_income"] is None:
-            summary["total_income"] = 0
-        if summary["total_expense"] is None:
-            summary["total_expense"] = 0
+        transactions = account.transactions.all()
+        # جمع‌های ذخیره‌شده حساب (بدون aggregate روی کل تاریخچه)
+        summary = conditional.account_totals(request, account_pk)
 
         # محاسبه جمع کل در متغیر جدا
         net_summary = summary["total_income"] - summary["total_expense"]
 
-        # balance
-        balance = 0
-        transaction_list = []
-        for txn in transactions:
-            if txn.type == "RE":
-                balance += txn.amount
-            else:
-                balance -= txn.amount
-            txn.balance = balance
-            transaction_list.append(txn)
-            print(balance)
-
-        # paginator
-        paginator = Paginator(transaction_list, 20)
-        page_number = request.GET.get("page")
-        page_obj = paginator.get_page(page_number)
+        after, before = request.GET.get("after"), request.GET.get("before")
+        # جدول صفحه از cache با کلید نسخه حساب؛ در صورت miss صفحه‌بندی با
+        # cursor و مانده هر ردیف به ترتیب (date, id)
+        ledger_table = fragments.render_cached(
+            fragments.ledger_key(account.pk, summary["version"], after, before),
+            "home/ledger_table.html",
+            lambda: {
+                "transactions": ledger_page(transactions, after=after, before=before),
+                "account": account,
+                "summary": net_summary,
+            },
+        )
 
         return render(
             request,
             "home/accoount_transactions.html",
             {
-                "transactions": page_obj,
+                "ledger_table": ledger_table,
+                "transaction_count": summary["transaction_count"],
                 "account": account,
+                "bulk_form": BulkTransactionsForm(user=request.user),
                 "summary": net_summary,  # اینجا عدد خالص
                 "total_income": summary["total_income"],  # اینجا دیکشنری اصلی
                 "total_expense": summary["total_expense"],
@@ -188,11 +297,19 @@ class AccountTransactionsView(LoginRequiredMixin, View):
         )
 
 
+class ExportAccountTransactionsView(LoginRequiredMixin, View):
+    def get(self, request, account_pk):
+        account = get_object_or_404(Account, user=request.user, id=account_pk)
+        return export_response(
+            account.transactions.all(), f"account-{account.id}-transactions.csv"
+        )
+
+
 class RegisterTransactionsView(LoginRequiredMixin, View):
     form_class = TransactionForm
 
     def get(self, request, account_pk, transaction_type):
-        form = self.form_class()
+        form = self.form_class(user=request.user)
         account = get_object_or_404(Account, user=request.user, pk=account_pk)
 
         if transaction_type == "re":
@@ -211,23 +328,28 @@ class RegisterTransactionsView(LoginRequiredMixin, View):
             },
         )
 
+    @method_decorator(retry_on_busy)
     def post(self, request, account_pk, transaction_type):
-        form = self.form_class(request.POST)
+        form = self.form_class(request.POST, user=request.user)
         account = get_object_or_404(Account, user=request.user, id=account_pk)
 
         if form.is_valid():
-            transaction = form.save(commit=False)
-            transaction.user = request.user
-            transaction.account = account
             if transaction_type == "re":
-                transaction.type = "RE"
+                type = "RE"
             elif transaction_type == "ex":
-                transaction.type = "EX"
+                type = "EX"
             else:
                 messages.warning(request, "نوع تراکنش مشخص نیست!", "warning")
                 return redirect("home:transactions")
+            with atomic():
+                # form.save دسته تازه را می‌سازد؛ در همان transaction نوشتن تراکنش
+                transaction = form.save(commit=False)
+                transaction.user = request.user
+                transaction.account = account
+                transaction.type = type
+                transaction.save()
+                balances.record(transaction)
             messages.success(request, "تراکنش با موفقیت ثبت شد.", "success")
-            transaction.save()
             return redirect("home:accounttransactions", account.id)
         if transaction_type == "re":
             transaction_type = "دریافت"
@@ -248,28 +370,60 @@ class RegisterTransactionsView(LoginRequiredMixin, View):
 class DeleteTransactionsView(LoginRequiredMixin, View):
     def get(self, request, account_pk, pk):
         account = get_object_or_404(Account, user=request.user, id=account_pk)
-        transaction = get_object_or_404(Transaction, id=pk)
-        if transaction.account.user == request.user and transaction.account == account:
+        transaction = account.transactions.filter(id=pk).first()
+        if transaction is not None:
             return render(
                 request,
                 "home/delete_confirm_transaction.html",
                 {"transaction": transaction, "account": account},
             )
-        else:
-            messages.warning(request, "این تراکنش مربوط به شما نمی باشد!", "warning")
+        messages.warning(request, "این تراکنش مربوط به شما نمی باشد!", "warning")
         return redirect("home:accounttransactions", account.id)
 
+    @method_decorator(retry_on_busy)
     def post(self, request, account_pk, pk):
         account = get_object_or_404(Account, user=request.user, id=account_pk)
-        transaction = get_object_or_404(Transaction, id=pk)
-        if transaction.account.user == request.user and transaction.account == account:
-            transaction.delete()
+        if bulk.delete(request.user, account.transactions.filter(id=pk)):
             messages.success(request, "تراکنش با موفقیت حذف شد.", "success")
         else:
             messages.warning(request, "این تراکنش مربوط به شما نمی باشد!", "warning")
         return redirect("home:accounttransactions", account.id)
 
 
+class BulkTransactionsView(LoginRequiredMixin, View):
+    form_class = BulkTransactionsForm
+
+    @method_decorator(retry_on_busy)
+    def post(self, request, account_pk):
+        account = get_object_or_404(Account, user=request.user, id=account_pk)
+        form = self.form_class(request.POST, user=request.user)
+        ids = [pk for pk in request.POST.getlist("ids") if pk.isdigit()]
+        if not ids:
+            messages.warning(request, "هیچ تراکنشی انتخاب نشده است.", "warning")
+        elif not form.is_valid():
+            for errors in form.errors.values():
+                messages.warning(request, errors[0], "warning")
+        else:
+            data = form.cleaned_data
+            transactions = Transaction.objects.filter(
+                account__user=request.user, account=account, id__in=ids
+            )
+            if data["action"] == "delete":
+                count = bulk.delete(request.user, transactions)
+                message = f"{count} تراکنش حذف شد."
+            else:
+                count = bulk.update(
+                    request.user,
+                    transactions,
+                    category=data["category"] if data["action"] == "category" else None,
+                    day=data["date"] if data["action"] == "date" else None,
+                    account=data["account"] if data["action"] == "move" else None,
+                )
+                message = f"{count} تراکنش به‌روزرسانی شد."
+            messages.success(request, message, "success")
+        return redirect("home:accounttransactions", account.id)
+
+
 class UpdateTransactionsView(LoginRequiredMixin, View):
     form_class = TransactionForm
 
@@ -277,28 +431,30 @@ class UpdateTransactionsView(LoginRequiredMixin, View):
         account = get_object_or_404(Account, user=request.user, id=account_pk)
         transaction = get_object_or_404(Transaction, account=account, id=pk)
 
-        greg_date = transaction.date
-        jalali_date = JalaliDate(greg_date)
-        formatted = f"{jalali_date.year}/{jalali_date.month:02}/{jalali_date.day:02}"
-
         initial_data = {
-            "date": formatted,
+            "date": jalali.format_date(transaction.date),
             "amount": transaction.amount,
             "description": transaction.description,
+            "category": categories.name(request.user.pk, transaction.category_id),
         }
-        form = self.form_class(initial=initial_data)
+        form = self.form_class(initial=initial_data, user=request.user)
         return render(
             request,
             "home/update_transaction.html",
             {"transaction": transaction, "account": account, "form": form},
         )
 
+    @method_decorator(retry_on_busy)
     def post(self, request, account_pk, pk):
         account = get_object_or_404(Account, user=request.user, id=account_pk)
-        transaction = get_object_or_404(Transaction, id=pk)
-        form = self.form_class(request.POST, instance=transaction)
+        transaction = get_object_or_404(Transaction, account=account, id=pk)
+        # مقدار قبلی قبل از اینکه فرم instance را تغییر دهد
+        previous = balances.entry(transaction)
+        form = self.form_class(request.POST, instance=transaction, user=request.user)
         if form.is_valid():
-            form.save()
+            with atomic():
+                form.save()
+                balances.replace(previous, transaction)
             messages.success(request, "تراکنش با موفقیت ویرایش شد.", "success")
         else:
             # اگر فرم اشتباه بود، دوباره فرم رو با خطاها نمایش بده
@@ -404,3 +560,34 @@ class ResetPassword(LoginRequiredMixin, View):
             return redirect("home:login")
 
         return render(request, "home/reset_password.html", {"form": form})
+
+
+class ReportsView(LoginRequiredMixin, View):
+    template = "home/reports.html"
+
+    def get(self, request):
+        year = int(jalali.format_date(timezone.localdate())[:4])
+        form = ReportForm(
+            request.GET or None,
+            user=request.user,
+            initial={"period": "month", "year": year},
+        )
+        data = form.cleaned_data if form.is_valid() else {}
+        account = data.get("account")
+
+        # جمع‌ها از CategoryDailyBalance؛ جدول تراکنش‌ها خوانده نمی‌شود
+        if data.get("start") and data.get("end"):
+            report = reports.range_report(
+                request.user, data["start"], data["end"], account
+            )
+        else:
+            periods = reports.periods(
+                data.get("year") or year, data.get("period") or "month"
+            )
+            report = reports.report(request.user, periods, account)
+
+        return render(
+            request,
+            self.template,
+            {"form": form, "report": report, "account": account},
+        )